@@ -0,0 +1,67 @@
+import asyncio, json
+
+from tjx_style_demo.crawler import crawl_catalog, crawl_products, fetch_products, fixture_catalog, parse_product_html, serve_fixtures
+
+def test_parse_fixture_jsonld():
+    with open("fixtures/sample_product_1.html", "rb") as f:
+        html = f.read()
+    # fed in tiny chunks to exercise the streaming parser
+    item = parse_product_html((html[i:i+7] for i in range(0, len(html), 7)), "x")
+    assert item["name"] == "Cable Knit Sweater - Cream"
+    assert item["price"] == 39.99
+    assert item["image"].endswith(".jpg")
+
+def test_fixture_catalog_handles_graph():
+    names = {p["name"]: p for p in fixture_catalog()}
+    assert names["Classic Wool Coat - Black"]["price"] == 99.99
+
+def test_crawl_local_server_then_revalidate(tmp_path):
+    cache = str(tmp_path / "http_cache.json")
+    with serve_fixtures() as base:
+        urls = [f"{base}/sample_product_1.html", f"{base}/sample_product_2.html", f"{base}/missing.html"]
+        first = crawl_catalog(urls, http_cache=cache, concurrency=2)
+        assert len(first) == 2
+
+        validators = json.load(open(cache))
+        again = asyncio.run(fetch_products(urls[:2], validators, concurrency=2))
+        assert [r["status"] for r in again] == [304, 304]
+        assert crawl_catalog(urls, http_cache=cache) == first
+
+def test_bad_charset_and_bad_url_become_error_results():
+    import http.server, threading
+
+    page = open("fixtures/sample_product_1.html", "rb").read()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=x-made-up")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        good = f"http://127.0.0.1:{httpd.server_address[1]}/p.html"
+        results = asyncio.run(fetch_products([good, "http://[bad-url/p.html"]))
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert results[0]["status"] == 200
+    assert results[0]["product"]["name"] == "Cable Knit Sweater - Cream"
+    assert results[1]["status"] is None and "error" in results[1]
+
+def test_failed_pages_are_unsure_not_gone(tmp_path):
+    cache = str(tmp_path / "http_cache.json")
+    with serve_fixtures() as base:
+        urls = [f"{base}/sample_product_1.html", f"{base}/missing.html"]
+        first, unsure = crawl_products(urls, http_cache=cache)
+        assert len(first) == 1 and unsure == set()
+    # server gone: the page errors, so it and the product last seen on it are "unsure"
+    again, unsure = crawl_products(urls, http_cache=cache)
+    assert again == []
+    assert unsure == {urls[0], first[0]["url"], urls[1]}
@@ -0,0 +1,74 @@
+import json, os
+
+import pytest
+
+from tjx_style_demo.images import page_slice, thumbnail_path
+
+def test_page_slice_clamps():
+    assert page_slice(14, 1, 6) == slice(0, 6)
+    assert page_slice(14, 3, 6) == slice(12, 14)
+    assert page_slice(14, 9, 6) == slice(12, 14)
+    assert page_slice(0, 1, 6) == slice(0, 0)
+
+def test_thumbnail_cached_by_content(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    src = os.path.abspath("fixtures/images/cream_sweater.png")
+    copy = tmp_path / "same_image.png"
+    copy.write_bytes(open(src, "rb").read())
+
+    cache = str(tmp_path / "thumbs")
+    p1 = thumbnail_path(src, (64, 64), cache)
+    p2 = thumbnail_path(str(copy), (64, 64), cache)
+    assert p1 == p2  # same bytes -> one cached thumbnail
+    with Image.open(p1) as im:
+        assert max(im.size) <= 64
+
+    os.remove(copy)  # second lookup is served from the index, no re-read
+    assert thumbnail_path(str(copy), (64, 64), cache) == p1
+
+def test_missing_image_is_none(tmp_path):
+    assert thumbnail_path(None) is None
+    assert thumbnail_path(str(tmp_path / "nope.png"), cache_dir=str(tmp_path)) is None
+
+def test_failures_are_cached_until_retry_after(tmp_path, monkeypatch):
+    pytest.importorskip("PIL.Image")
+    from tjx_style_demo import images
+
+    src, cache = tmp_path / "late.png", str(tmp_path / "thumbs")
+    assert thumbnail_path(str(src), (64, 64), cache) is None
+    src.write_bytes(open("fixtures/images/cream_sweater.png", "rb").read())
+    assert thumbnail_path(str(src), (64, 64), cache) is None  # not retried yet
+
+    later = images.time.time() + images.THUMB_RETRY_AFTER + 1
+    monkeypatch.setattr(images.time, "time", lambda: later)
+    path = thumbnail_path(str(src), (64, 64), cache)
+    assert path and os.path.exists(path)
+
+    os.remove(os.path.join(cache, "index.json"))  # hits come from memory
+    assert thumbnail_path(str(src), (64, 64), cache) == path
+
+def test_truncated_download_is_recorded_as_failure(tmp_path):
+    import http.server, threading
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            self.wfile.write(b"\x89PNG short")  # connection closes before 1000 bytes
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/img.png"
+    try:
+        cache = str(tmp_path / "thumbs")
+        assert thumbnail_path(url, (64, 64), cache) is None
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    with open(os.path.join(cache, "index.json")) as f:
+        assert url in json.load(f)["failed"]
@@ -0,0 +1,83 @@
+import json
+
+from tjx_style_demo.index import CatalogIndex
+from tjx_style_demo.versions import append_delta, apply_delta, diff_catalogs, load_catalog_version
+
+V0 = [
+    {"name": "Cable Knit Sweater - Cream", "price": 39.99, "url": "u/sweater", "image": None},
+    {"name": "Striped Swim Top", "price": 19.99, "url": "u/swim", "image": None},
+    {"name": "Canvas Tote - Beige", "price": 19.99, "url": "u/tote", "image": None},
+]
+V1 = [
+    {"name": "Cable Knit Sweater - Cream", "price": 29.99, "url": "u/sweater", "image": None},
+    {"name": "Canvas Tote - Navy", "price": 19.99, "url": "u/tote", "image": None},
+    {"name": "Leather Chelsea Boots - Black", "price": 59.99, "url": "u/boots", "image": None},
+]
+
+def test_delta_roundtrip():
+    d = diff_catalogs(V0, V1)
+    assert [i["url"] for i in d["added"]] == ["u/boots"]
+    assert d["removed"] == ["u/swim"]
+    assert d["price_changed"] == [{"key": "u/sweater", "old": 39.99, "new": 29.99}]
+    assert apply_delta(V0, d) == V1
+
+def test_old_versions_stay_readable(tmp_path):
+    base, log = tmp_path / "cat.json", tmp_path / "cat.deltas.jsonl"
+    base.write_text(json.dumps(V0))
+    append_delta(diff_catalogs(V0, V1), str(log))
+    assert load_catalog_version(0, str(base), str(log)) == V0
+    assert load_catalog_version(None, str(base), str(log)) == V1
+    assert json.loads(base.read_text()) == V0  # base snapshot untouched
+
+def test_index_updates_incrementally():
+    idx = CatalogIndex(V0)
+    idx.apply_delta(dict(diff_catalogs(V0, V1), version=1))
+    fresh = CatalogIndex(V1)
+    assert idx.catalog() == fresh.catalog()
+    assert idx.keyword == fresh.keyword
+    assert idx.version == 1
+
+def test_concurrent_appends_get_distinct_versions(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from tjx_style_demo.versions import read_deltas
+
+    log = str(tmp_path / "cat.deltas.jsonl")
+    d = diff_catalogs(V0, V1)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: append_delta(d, log), range(40)))
+    assert [r["version"] for r in read_deltas(log)] == list(range(1, 41))
+
+def test_live_index_swaps_in_a_copy(tmp_path):
+    from tjx_style_demo.index import LiveIndex
+
+    log = str(tmp_path / "cat.deltas.jsonl")
+    live = LiveIndex(CatalogIndex(V0), deltas_path=log)
+    before = live.catch_up()
+    append_delta(diff_catalogs(V0, V1), log)
+    after = live.catch_up()
+    assert after is not before and after.version == 1
+    assert before.catalog() == V0
+    assert after.catalog() == CatalogIndex(V1).catalog()
+    assert live.catch_up() is after
+
+def test_refresh_keeps_items_whose_page_failed(tmp_path, monkeypatch):
+    from tjx_style_demo import catalog as cat
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / cat.CATALOG_CACHE).write_text(json.dumps(V0))
+    fetched = [dict(V0[0], price=29.99)]  # swim page timed out, tote page is gone (404)
+    monkeypatch.setattr(cat, "_fetch_catalog", lambda n, mock=False: (fetched, {"u/swim"}))
+
+    _, delta = cat.refresh_catalog()
+    assert delta["removed"] == ["u/tote"]
+    assert [i["url"] for i in cat.load_or_buildCatalog(10**9)] == ["u/sweater", "u/swim"]
+
+def test_rebuilding_the_base_resets_the_history(tmp_path, monkeypatch):
+    from tjx_style_demo import catalog as cat
+
+    monkeypatch.chdir(tmp_path)
+    append_delta(diff_catalogs(V0, V1), cat.CATALOG_DELTAS)
+    monkeypatch.setattr(cat, "build_catalog", lambda n: V0)
+    assert cat.load_or_buildCatalog(10**9) == V0
+    assert not (tmp_path / cat.CATALOG_DELTAS).exists()
+    assert cat.load_or_buildCatalog(10**9) == V0
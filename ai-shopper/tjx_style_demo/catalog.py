@@ -1,5 +1,7 @@
 import json, os
-from .config import CATALOG_CACHE
+from .config import CATALOG_CACHE, CATALOG_DELTAS, MOCK, PRODUCT_URLS_FILE
+from .versions import (append_delta, apply_delta, deltas_lock, diff_catalogs, is_empty, item_key,
+                       load_catalog_version)
 
 # A small, static sample catalog (works offline). Feel free to add items or real URLs.
 SAMPLE = [
@@ -10,16 +12,77 @@ SAMPLE = [
     {"name": "Canvas Tote - Beige",        "price": 19.99, "url": "https://example.com/tote",    "image": None},
 ]
 
-def load_or_buildCatalog(max_products: int = 40):
+def _product_urls(path: str = PRODUCT_URLS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [ln.strip() for ln in f if ln.strip() and not ln.startswith("#")]
+
+def build_catalog(max_products: int = 40, mock: bool = MOCK, fallback: bool = True):
+    """
+    MOCK: parse JSON-LD from fixtures/*.html.
+    Live: crawl the URLs listed in PRODUCT_URLS_FILE (concurrently, conditional GETs).
+    Falls back to SAMPLE when neither yields any products (unless fallback=False).
     """
-    If a cache exists, load it; otherwise seed it with SAMPLE data.
-    Replace SAMPLE with real extraction if/when you turn on live fetching.
+    catalog, _ = _fetch_catalog(max_products, mock)
+    if not catalog and fallback:
+        catalog = SAMPLE
+    return catalog[:max_products]
+
+def _fetch_catalog(max_products: int, mock: bool = MOCK):
+    """(products, keys whose page could not be fetched this time; see crawl_products)."""
+    from .crawler import crawl_products, fixture_catalog
+
+    if mock:
+        return fixture_catalog()[:max_products], set()
+    urls = _product_urls()[:max_products]
+    if not urls:
+        return [], set()
+    catalog, unsure = crawl_products(urls)
+    return catalog[:max_products], unsure
+
+def load_or_buildCatalog(max_products: int = 40, version=None):
+    """
+    If a cache exists, load it (latest version, or `version` for reproducible
+    outfits); otherwise build it (fixtures in MOCK mode, live JSON-LD extraction
+    otherwise) and cache the result as version 0. A new base starts a new
+    history: CATALOG_DELTAS is reset, since old deltas describe the old base.
     """
     if os.path.exists(CATALOG_CACHE):
-        with open(CATALOG_CACHE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_catalog_version(version, CATALOG_CACHE, CATALOG_DELTAS)[:max_products]
 
-    catalog = SAMPLE[:max_products]
-    with open(CATALOG_CACHE, "w", encoding="utf-8") as f:
-        json.dump(catalog, f, indent=2)
+    with deltas_lock(CATALOG_DELTAS):
+        if os.path.exists(CATALOG_CACHE):  # another process built it meanwhile
+            return load_catalog_version(version, CATALOG_CACHE, CATALOG_DELTAS)[:max_products]
+        catalog = build_catalog(max_products)
+        if os.path.exists(CATALOG_DELTAS):
+            os.remove(CATALOG_DELTAS)
+        tmp = CATALOG_CACHE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2)
+        os.replace(tmp, CATALOG_CACHE)
     return catalog
+
+def refresh_catalog(max_products: int = 40):
+    """
+    Re-fetch the catalog and record what changed as a new version.
+    Only the delta is written (appended to CATALOG_DELTAS). The fetch happens
+    outside the lock; the diff is taken under it, against the latest version,
+    so concurrent refreshes (other sessions or processes) never record a delta
+    against a stale catalog. Indexes catch up with LiveIndex.catch_up().
+    Products whose page failed to fetch (timeout, 5xx, ...) are carried over
+    unchanged; only a 404/410 records a removal.
+    Returns (catalog, delta); delta is None when nothing changed.
+    """
+    fresh, unsure = _fetch_catalog(max_products)
+    with deltas_lock(CATALOG_DELTAS):
+        current = load_or_buildCatalog(max_products=10**9)
+        if not fresh:  # source unavailable: keep what we have rather than "remove everything"
+            return current[:max_products], None
+        have = {item_key(it) for it in fresh}
+        fresh = fresh + [it for it in current if item_key(it) in unsure and item_key(it) not in have]
+        delta = diff_catalogs(current, fresh)
+        if is_empty(delta):
+            return current[:max_products], None
+        delta = append_delta(delta, CATALOG_DELTAS)
+    return apply_delta(current, delta)[:max_products], delta
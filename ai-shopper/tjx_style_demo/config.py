@@ -1,2 +1,17 @@
+import os
+
 BASE_URL='https://tjmaxx.tjx.com'
-CATALOG_CACHE='tjmaxx_catalog.json'
+CATALOG_CACHE='tjmaxx_catalog.json'               # version 0 (never rewritten)
+CATALOG_DELTAS='tjmaxx_catalog.deltas.jsonl'       # one line per refresh
+
+# Live crawling
+MOCK=os.getenv('MOCK','0')=='1'
+FIXTURES_DIR=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'fixtures')
+PRODUCT_URLS_FILE='product_urls.txt'   # one product page URL per line
+HTTP_CACHE='tjmaxx_http_cache.json'    # ETag / Last-Modified per URL
+CRAWL_CONCURRENCY=int(os.getenv('CRAWL_CONCURRENCY','8'))
+
+# Image thumbnails (content-addressed, see images.py)
+THUMB_CACHE_DIR='.thumb_cache'
+THUMB_SIZE=(320,320)
+THUMB_RETRY_AFTER=int(os.getenv('THUMB_RETRY_AFTER','3600'))  # seconds before a failed image is tried again
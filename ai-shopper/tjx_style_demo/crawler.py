@@ -0,0 +1,311 @@
+import asyncio, codecs, contextlib, functools, hashlib, http.client, http.server, json, os, queue, threading
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from .config import HTTP_CACHE, CRAWL_CONCURRENCY, FIXTURES_DIR
+
+USER_AGENT = "tjx-style-demo/0.1 (+catalog builder)"
+CHUNK_SIZE = 16384
+
+
+class JsonLdParser(HTMLParser):
+    """
+    Streaming extractor for <script type="application/ld+json"> blocks.
+    Feed it the page in chunks as they arrive; everything outside the
+    JSON-LD scripts is skipped without building a DOM.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.blocks: List[str] = []
+        self._buf: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and any(k == "type" and (v or "").strip().lower() == "application/ld+json" for k, v in attrs):
+            self._buf = []
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._buf is not None:
+            self.blocks.append("".join(self._buf))
+            self._buf = None
+
+    def handle_data(self, data):
+        if self._buf is not None:
+            self._buf.append(data)
+
+
+def _iter_nodes(doc):
+    if isinstance(doc, list):
+        for d in doc:
+            yield from _iter_nodes(d)
+    elif isinstance(doc, dict):
+        yield doc
+        if "@graph" in doc:
+            yield from _iter_nodes(doc["@graph"])
+
+
+def _is_product(node: Dict) -> bool:
+    t = node.get("@type")
+    types = t if isinstance(t, list) else [t]
+    return "Product" in types
+
+
+def _first(v):
+    if isinstance(v, list):
+        return _first(v[0]) if v else None
+    if isinstance(v, dict):
+        return v.get("url") or v.get("contentUrl")
+    return v
+
+
+def _price(offers) -> Optional[float]:
+    for o in (offers if isinstance(offers, list) else [offers]):
+        if not isinstance(o, dict):
+            continue
+        p = o.get("price", o.get("lowPrice"))
+        if p is None and isinstance(o.get("priceSpecification"), dict):
+            p = o["priceSpecification"].get("price")
+        try:
+            return round(float(str(p).replace("$", "").replace(",", "")), 2)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def product_from_jsonld(blocks: Iterable[str], url: str) -> Optional[Dict]:
+    """First schema.org Product in the page, as a catalog item (name/price/url/image)."""
+    for raw in blocks:
+        try:
+            doc = json.loads(raw)
+        except ValueError:
+            continue
+        for node in _iter_nodes(doc):
+            if _is_product(node) and node.get("name"):
+                return {
+                    "name": str(node["name"]).strip(),
+                    "price": _price(node.get("offers")),
+                    "url": node.get("url") or url,
+                    "image": _first(node.get("image")),
+                }
+    return None
+
+
+def parse_product_html(chunks: Iterable[bytes], url: str, encoding: str = "utf-8") -> Optional[Dict]:
+    p = JsonLdParser()
+    for chunk in chunks:
+        p.feed(chunk.decode(encoding, errors="replace") if isinstance(chunk, bytes) else chunk)
+    p.close()
+    return product_from_jsonld(p.blocks, url)
+
+
+# ----- HTTP with connection reuse -----
+
+class _ConnectionPool:
+    """Keep-alive connections per (scheme, host), shared by the worker threads."""
+    def __init__(self, timeout: float = 15.0):
+        self.timeout = timeout
+        self._pools: Dict[tuple, queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key):
+        with self._lock:
+            return self._pools.setdefault(key, queue.LifoQueue())
+
+    def get(self, scheme: str, host: str):
+        try:
+            return self._queue((scheme, host)).get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            return cls(host, timeout=self.timeout)
+
+    def put(self, scheme: str, host: str, conn):
+        self._queue((scheme, host)).put(conn)
+
+    def close(self):
+        with self._lock:
+            for q in self._pools.values():
+                while not q.empty():
+                    q.get_nowait().close()
+            self._pools.clear()
+
+
+def _fetch(pool: _ConnectionPool, url: str, cached: Optional[Dict]) -> Dict:
+    """
+    GET one page (blocking). Sends If-None-Match / If-Modified-Since when we
+    have validators; a 304 reuses the stored product without re-parsing.
+    """
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html"}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    for attempt in (1, 2):  # one retry if a pooled keep-alive socket went stale
+        conn = pool.get(parts.scheme, parts.netloc)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            if resp.status == 304:
+                resp.read()
+                pool.put(parts.scheme, parts.netloc, conn)
+                return dict(cached, url=url, status=304)
+            if resp.status != 200:
+                resp.read()
+                pool.put(parts.scheme, parts.netloc, conn)
+                return {"url": url, "status": resp.status, "product": None}
+            charset = resp.headers.get_content_charset() or "utf-8"
+            try:
+                codecs.lookup(charset)
+            except LookupError:  # misspelled or made-up charset in the header
+                charset = "utf-8"
+            product = parse_product_html(iter(functools.partial(resp.read, CHUNK_SIZE), b""), url, charset)
+            pool.put(parts.scheme, parts.netloc, conn)
+            return {
+                "url": url,
+                "status": 200,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "product": product,
+            }
+        except (http.client.HTTPException, ConnectionError) as e:
+            conn.close()
+            if attempt == 2:
+                return {"url": url, "status": None, "product": None, "error": str(e)}
+        except Exception as e:  # socket errors, or a page that breaks the parser
+            conn.close()
+            return {"url": url, "status": None, "product": None, "error": f"{type(e).__name__}: {e}"}
+
+
+async def fetch_products(urls: List[str], validators: Optional[Dict[str, Dict]] = None,
+                         concurrency: int = CRAWL_CONCURRENCY) -> List[Dict]:
+    """
+    Fetch product pages with at most `concurrency` requests in flight.
+    Returns one result per url (same order) with status, validators and product;
+    a url that fails in any way gets an "error" result instead of failing the batch.
+    """
+    validators = validators or {}
+    sem = asyncio.Semaphore(max(1, concurrency))
+    pool = _ConnectionPool()
+
+    async def one(u):
+        async with sem:
+            try:
+                return await asyncio.to_thread(_fetch, pool, u, validators.get(u))
+            except Exception as e:  # e.g. a malformed url
+                return {"url": u, "status": None, "product": None, "error": f"{type(e).__name__}: {e}"}
+
+    try:
+        return await asyncio.gather(*(one(u) for u in urls))
+    finally:
+        pool.close()
+
+
+def _load_validators(path: str) -> Dict[str, Dict]:
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def crawl_products(urls: List[str], http_cache: str = HTTP_CACHE,
+                   concurrency: int = CRAWL_CONCURRENCY) -> Tuple[List[Dict], Set[str]]:
+    """
+    Like crawl_catalog(), but also returns the urls whose fate is unknown:
+    pages that errored, timed out or answered anything but 200/304/404/410
+    (plus the product url last seen on each), so a refresh can keep those
+    products instead of treating them as removed. Only 404/410 mean "gone".
+    """
+    validators = _load_validators(http_cache)
+    results = asyncio.run(fetch_products(urls, validators, concurrency))
+
+    catalog, seen, unsure = [], set(), set()
+    for r in results:
+        if r.get("status") in (200, 304) and r.get("product"):
+            validators[r["url"]] = {k: r.get(k) for k in ("etag", "last_modified", "product")}
+            item = r["product"]
+            if item["url"] not in seen:
+                seen.add(item["url"])
+                catalog.append(item)
+        elif r.get("status") in (404, 410):
+            validators.pop(r["url"], None)
+        else:
+            unsure.add(r["url"])
+            last = (validators.get(r["url"]) or {}).get("product")
+            if last and last.get("url"):
+                unsure.add(last["url"])
+
+    if http_cache:
+        with open(http_cache, "w", encoding="utf-8") as f:
+            json.dump(validators, f, indent=2)
+    return catalog, unsure
+
+
+def crawl_catalog(urls: List[str], http_cache: str = HTTP_CACHE,
+                  concurrency: int = CRAWL_CONCURRENCY) -> List[Dict]:
+    """
+    Build a catalog from live product pages. ETag/Last-Modified validators are
+    kept in `http_cache`, so re-running only downloads pages that changed.
+    """
+    return crawl_products(urls, http_cache, concurrency)[0]
+
+
+def fixture_catalog(fixtures_dir: str = FIXTURES_DIR) -> List[Dict]:
+    """MOCK mode: parse the saved product pages in fixtures/ (no network)."""
+    catalog = []
+    if not os.path.isdir(fixtures_dir):
+        return catalog
+    for fn in sorted(os.listdir(fixtures_dir)):
+        if not fn.endswith(".html"):
+            continue
+        path = os.path.join(fixtures_dir, fn)
+        with open(path, "rb") as f:
+            item = parse_product_html(iter(functools.partial(f.read, CHUNK_SIZE), b""), "file://" + os.path.abspath(path))
+        if item:
+            catalog.append(item)
+    return catalog
+
+
+# ----- local fixture server (tests / benchmarks, fully offline) -----
+
+class _FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is exercised
+
+    def end_headers(self):
+        if getattr(self, "_etag", None):
+            self.send_header("ETag", self._etag)
+        super().end_headers()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        self._etag = None
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                self._etag = '"%s"' % hashlib.sha1(f.read()).hexdigest()[:16]
+            if self.headers.get("If-None-Match") == self._etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_fixtures(directory: str = FIXTURES_DIR):
+    """Serve `directory` on 127.0.0.1 (random port); yields the base URL."""
+    handler = functools.partial(_FixtureHandler, directory=directory)
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
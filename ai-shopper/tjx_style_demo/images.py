@@ -0,0 +1,130 @@
+import hashlib, http.client, io, json, os, threading, time, urllib.request
+from typing import Dict, Optional, Tuple
+
+from .config import THUMB_CACHE_DIR, THUMB_RETRY_AFTER, THUMB_SIZE
+
+# Thumbnail cache
+# ---------------
+# Each source image is downloaded once. Thumbnails are stored under
+# THUMB_CACHE_DIR named by the SHA-256 of the ORIGINAL bytes, so identical
+# images reached through different URLs share one file:
+#   <dir>/<sha256>_<w>x<h>.jpg
+#   <dir>/index.json   {"digests": {url: sha256}, "failed": {url: retry_after}}
+# The digests let us skip the download next time; a URL that could not be
+# fetched or decoded is not tried again before its retry_after (epoch seconds,
+# THUMB_RETRY_AFTER from the failure). The index is read once per process and
+# kept in memory; it is written back only when an entry changes.
+
+_lock = threading.Lock()
+_indexes: Dict[str, dict] = {}  # cache_dir -> index
+
+def _index_path(cache_dir: str) -> str:
+    return os.path.join(cache_dir, "index.json")
+
+def _read_index(cache_dir: str) -> dict:
+    try:
+        with open(_index_path(cache_dir), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if "digests" not in index:  # older flat url -> sha256 files
+        index = {"digests": index}
+    index.setdefault("failed", {})
+    return index
+
+def _index(cache_dir: str) -> dict:
+    """In-memory index for `cache_dir` (call with _lock held)."""
+    index = _indexes.get(cache_dir)
+    if index is None:
+        index = _indexes[cache_dir] = _read_index(cache_dir)
+    return index
+
+def _record(cache_dir: str, src: str, digest: Optional[str] = None, retry_after: Optional[float] = None):
+    """Store a success (digest) or a failure (retry_after) for `src`, in memory and on disk."""
+    with _lock:
+        index = _index(cache_dir)
+        on_disk = _read_index(cache_dir)  # keep entries written by other processes
+        for part in ("digests", "failed"):
+            on_disk[part].update(index[part])
+        index.update(on_disk)
+        if digest is not None:
+            index["digests"][src] = digest
+            index["failed"].pop(src, None)
+        else:
+            index["failed"][src] = retry_after
+        tmp = _index_path(cache_dir) + f".{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, _index_path(cache_dir))
+
+def read_source(src: str, timeout: float = 15.0) -> bytes:
+    """Bytes of an image given an http(s) URL, a file:// URL or a local path."""
+    if src.startswith(("http://", "https://", "file://")):
+        req = urllib.request.Request(src, headers={"User-Agent": "tjx-style-demo/0.1"})
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.read()
+    with open(src, "rb") as f:
+        return f.read()
+
+def make_thumbnail(data: bytes, size: Tuple[int, int] = THUMB_SIZE) -> bytes:
+    from PIL import Image  # Pillow is only needed when a thumbnail is actually built
+
+    with Image.open(io.BytesIO(data)) as im:
+        im.draft("RGB", size)  # JPEG: let the decoder downscale while decoding
+        im = im.convert("RGB")
+        im.thumbnail(size)
+        out = io.BytesIO()
+        im.save(out, format="JPEG", quality=85, optimize=True)
+        return out.getvalue()
+
+def thumbnail_path(src: Optional[str], size: Tuple[int, int] = THUMB_SIZE,
+                   cache_dir: str = THUMB_CACHE_DIR) -> Optional[str]:
+    """
+    Path of a cached thumbnail for `src`, building it on first use.
+    Returns None if there is no image or it cannot be fetched/decoded; such
+    failures are remembered and not retried for THUMB_RETRY_AFTER seconds.
+    """
+    if not src:
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    suffix = f"_{size[0]}x{size[1]}.jpg"
+
+    with _lock:
+        index = _index(cache_dir)
+        digest = index["digests"].get(src)
+        retry_after = index["failed"].get(src)
+    if digest:
+        path = os.path.join(cache_dir, digest + suffix)
+        if os.path.exists(path):
+            return path
+    if retry_after is not None and time.time() < retry_after:
+        return None
+
+    try:
+        data = read_source(src)
+    except (OSError, ValueError, http.client.HTTPException):  # HTTPException: e.g. truncated body
+        _record(cache_dir, src, retry_after=time.time() + THUMB_RETRY_AFTER)
+        return None
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(cache_dir, digest + suffix)
+    if not os.path.exists(path):
+        try:
+            thumb = make_thumbnail(data, size)
+        except Exception:  # not an image / unsupported format
+            _record(cache_dir, src, retry_after=time.time() + THUMB_RETRY_AFTER)
+            return None
+        tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(thumb)
+        os.replace(tmp, path)
+
+    if index["digests"].get(src) != digest:
+        _record(cache_dir, src, digest=digest)
+    return path
+
+def page_slice(n_items: int, page: int, per_page: int) -> slice:
+    """Items shown on 1-based `page` (clamped to the valid range)."""
+    pages = max(1, -(-n_items // per_page))
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+    return slice(start, min(start + per_page, n_items))
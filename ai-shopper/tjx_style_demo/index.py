@@ -0,0 +1,109 @@
+import os, threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from .config import CATALOG_DELTAS
+from .versions import deltas_since, item_key
+
+# Substrings prefilter() looks for in product names
+COLD_WEATHER_EXCLUDE = ("swim", "bikini")
+NEUTRALS = ("black", "white", "cream", "beige", "tan", "grey", "gray")
+KEYWORDS = COLD_WEATHER_EXCLUDE + NEUTRALS
+
+class CatalogIndex:
+    """
+    Lookup structures over a catalog that are maintained from deltas
+    (apply_delta) instead of being rebuilt on every refresh:
+      - items:   key -> item, in catalog order
+      - keyword: keyword -> keys whose lowercased name contains it
+    """
+    def __init__(self, catalog: Iterable[Dict] = (), keywords: Iterable[str] = KEYWORDS, version: int = 0):
+        self.keywords = tuple(keywords)
+        self.items: Dict[str, Dict] = {}
+        self.keyword: Dict[str, Set[str]] = {k: set() for k in self.keywords}
+        self.version = version
+        for it in catalog:
+            self._add(it)
+
+    def _add(self, it: Dict):
+        k = item_key(it)
+        if k in self.items:
+            self._remove(k)
+        self.items[k] = it
+        name = (it.get("name") or "").lower()
+        for w in self.keywords:
+            if w in name:
+                self.keyword[w].add(k)
+
+    def _remove(self, k: str):
+        it = self.items.pop(k, None)
+        if it is None:
+            return
+        for keys in self.keyword.values():
+            keys.discard(k)
+
+    def apply_delta(self, delta: Dict):
+        for k in delta.get("removed", []):
+            self._remove(k)
+        for it in delta.get("updated", []):
+            k = item_key(it)
+            if k in self.items:
+                self.items[k] = dict(it, price=self.items[k].get("price"))
+                name = (it.get("name") or "").lower()
+                for w in self.keywords:
+                    (self.keyword[w].add if w in name else self.keyword[w].discard)(k)
+        for c in delta.get("price_changed", []):
+            if c["key"] in self.items:
+                self.items[c["key"]] = dict(self.items[c["key"]], price=c["new"])
+        for it in delta.get("added", []):
+            self._add(it)
+        if "version" in delta:
+            self.version = delta["version"]
+        return self
+
+    def with_any(self, words: Iterable[str]) -> Set[str]:
+        out: Set[str] = set()
+        for w in words:
+            out |= self.keyword.get(w, set())
+        return out
+
+    def catalog(self) -> List[Dict]:
+        return list(self.items.values())
+
+    def copy(self) -> "CatalogIndex":
+        new = CatalogIndex(keywords=self.keywords, version=self.version)
+        new.items = dict(self.items)
+        new.keyword = {w: set(keys) for w, keys in self.keyword.items()}
+        return new
+
+class LiveIndex:
+    """
+    The latest CatalogIndex, shared across sessions. `current` is never
+    modified once published: catch_up() applies newly recorded deltas (from
+    any process) to a copy and swaps it in, so readers never see an index
+    change under them.
+    """
+    def __init__(self, index: CatalogIndex, deltas_path: str = CATALOG_DELTAS):
+        self.current = index
+        self.deltas_path = deltas_path
+        self._lock = threading.Lock()
+        self._seen: Optional[tuple] = None
+
+    def _stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.deltas_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def catch_up(self) -> CatalogIndex:
+        with self._lock:
+            stamp = self._stamp()
+            if stamp != self._seen:  # the log only grows, so an unchanged stat means no new deltas
+                pending = deltas_since(self.current.version, self.deltas_path)
+                if pending:
+                    idx = self.current.copy()
+                    for d in pending:
+                        idx.apply_delta(d)
+                    self.current = idx
+                self._seen = stamp
+            return self.current
@@ -1,6 +1,13 @@
-import os, json, random
-from typing import List, Dict
-from .quiz import Quiz
+from __future__ import annotations
+
+import functools, os, json, random
+from typing import TYPE_CHECKING, List, Dict, Optional
+from .index import CatalogIndex, COLD_WEATHER_EXCLUDE, NEUTRALS
+from .spans import span
+from .versions import item_key
+
+if TYPE_CHECKING:  # pydantic is only needed by whoever builds the Quiz
+    from .quiz import Quiz
 
 def _stub_outfit(quiz: Quiz, items: List[Dict]) -> str:
     """
@@ -35,6 +42,12 @@ def _stub_outfit(quiz: Quiz, items: List[Dict]) -> str:
     ]
     return "\n".join(lines)
 
+@functools.lru_cache(maxsize=1)
+def _openai_client(api_key: str):
+    """The OpenAI SDK is imported on first use and one client (with its connection pool) is reused."""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
 def compose_outfit(quiz: Quiz, items: List[Dict]) -> str:
     """
     Uses OpenAI if OPENAI_API_KEY is set; otherwise falls back to the stub.
@@ -44,31 +57,41 @@ def compose_outfit(quiz: Quiz, items: List[Dict]) -> str:
         return _stub_outfit(quiz, items)
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
+        client = _openai_client(api_key)
         sys = ("You are a retail stylist for T.J. Maxx. Build a cohesive outfit from the provided real products. "
                "Stay under the user's budget. Prefer 2–4 items. Return valid Markdown with a short rationale.")
         user = {"quiz": quiz.model_dump(), "catalog_sample": items}
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"system","content":sys},
-                      {"role":"user","content":json.dumps(user)}],
-            temperature=0.5,
-            max_tokens=600,
-        )
+        with span("llm call", model="gpt-4o-mini", items=len(items)):
+            resp = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role":"system","content":sys},
+                          {"role":"user","content":json.dumps(user)}],
+                temperature=0.5,
+                max_tokens=600,
+            )
         return resp.choices[0].message.content
     except Exception:
         return _stub_outfit(quiz, items)
 
-def prefilter(catalog: List[Dict], quiz: Quiz, limit: int = 18) -> List[Dict]:
+def prefilter(catalog: List[Dict], quiz: Quiz, limit: int = 18, index: Optional[CatalogIndex] = None) -> List[Dict]:
     """
     Light filtering so we only pass a small, relevant slice to the 'LLM'.
+    If an up-to-date CatalogIndex for `catalog` is given, keyword filters use
+    its lookups instead of scanning every name.
     """
     pool = [c for c in catalog if c.get("price") and c["price"] > 0]
     if quiz.season in ("winter","fall"):
-        pool = [p for p in pool if not any(w in (p.get("name","").lower()) for w in ("swim","bikini"))]
+        if index is not None:
+            skip = index.with_any(COLD_WEATHER_EXCLUDE)
+            pool = [p for p in pool if item_key(p) not in skip]
+        else:
+            pool = [p for p in pool if not any(w in (p.get("name","").lower()) for w in COLD_WEATHER_EXCLUDE)]
     if quiz.palette == "neutrals":
-        neut = [p for p in pool if any(k in (p.get("name","").lower()) for k in ("black","white","cream","beige","tan","grey","gray"))]
+        if index is not None:
+            keep = index.with_any(NEUTRALS)
+            neut = [p for p in pool if item_key(p) in keep]
+        else:
+            neut = [p for p in pool if any(k in (p.get("name","").lower()) for k in NEUTRALS)]
         pool = neut or pool
     random.shuffle(pool)
     return pool[:limit]
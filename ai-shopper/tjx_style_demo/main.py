@@ -1,8 +1,11 @@
-from .quiz import Quiz
-from .catalog import load_or_buildCatalog
-from .llm import prefilter, compose_outfit
+# Modules are imported inside main() so `python -m tjx_style_demo.main` (and
+# anything that just imports this module) only pays for what a run uses.
 
 def main():
+    from .quiz import Quiz
+    from .catalog import load_or_buildCatalog
+    from .llm import prefilter, compose_outfit
+
     q=Quiz(season='fall',vibe='cozy',palette='neutrals',budget=100)
     cat=load_or_buildCatalog()
     s=prefilter(cat,q)
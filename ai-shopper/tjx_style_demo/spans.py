@@ -0,0 +1,18 @@
+import contextlib
+
+# Span timings and the per-rerun profile panel come from the explorer apps'
+# streamlit/tracing.py when it is importable (PYTHONPATH=../streamlit from this
+# directory). Otherwise spans are no-ops and no panel is shown, so the package
+# does not depend on the rest of the repo.
+try:
+    from tracing import begin_rerun, end_rerun, span
+except ImportError:
+    @contextlib.contextmanager
+    def span(name, **attrs):
+        yield None
+
+    def begin_rerun(app):
+        return None
+
+    def end_rerun(trace, expanded=False):
+        pass
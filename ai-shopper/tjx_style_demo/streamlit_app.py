@@ -4,11 +4,16 @@ from dotenv import load_dotenv
 load_dotenv() 
 
 from tjx_style_demo.quiz import Quiz
-from tjx_style_demo.catalog import load_or_buildCatalog
+from tjx_style_demo.catalog import load_or_buildCatalog, refresh_catalog
+from tjx_style_demo.images import page_slice, thumbnail_path
+from tjx_style_demo.index import CatalogIndex, LiveIndex
+from tjx_style_demo.versions import deltas_lock, latest_version
 from tjx_style_demo.llm import prefilter, compose_outfit
+from tjx_style_demo.spans import begin_rerun, end_rerun, span
 
 st.set_page_config(page_title="TJX Style Quiz", page_icon="🛍️", layout="wide")
 st.title("🛍️ TJX Style Quiz — Outfit Recommender")
+trace = begin_rerun("style_quiz")
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -22,19 +27,69 @@ with col4:
 
 quiz = Quiz(season=season, vibe=vibe, palette=palette, budget=budget)
 
-catalog = load_or_buildCatalog(max_products=40)
-st.caption(f"Catalog size: {len(catalog)} items")
+MAX_PRODUCTS = 40
+
+# Latest catalog + index, one per server process and shared by every browser
+# session (read-only). Each rerun catches up with new deltas, including ones
+# recorded by other processes, by swapping in an updated copy.
+@st.cache_resource
+def live_index():
+    with deltas_lock():
+        catalog = load_or_buildCatalog(max_products=MAX_PRODUCTS)
+        return LiveIndex(CatalogIndex(catalog, version=latest_version()))
+
+# Older versions, for reproducing earlier outfits
+@st.cache_resource
+def catalog_at(version: int):
+    catalog = load_or_buildCatalog(max_products=MAX_PRODUCTS, version=version)
+    return catalog, CatalogIndex(catalog, version=version)
+
+with st.sidebar:
+    st.header("Catalog")
+    if st.button("🔄 Refresh catalog"):
+        _, delta = refresh_catalog(max_products=MAX_PRODUCTS)
+        if delta:
+            st.success(f"v{delta['version']}: +{len(delta['added'])} added, "
+                       f"-{len(delta['removed'])} removed, {len(delta['price_changed'])} price changes")
+        else:
+            st.info("No changes.")
+    live = live_index().catch_up()
+    latest = live.version
+    version = st.selectbox("Catalog version", list(range(latest, -1, -1)), index=0,
+                           format_func=lambda v: f"v{v} (latest)" if v == latest else f"v{v}")
+
+if version == latest:
+    index = live
+    catalog = index.catalog()[:MAX_PRODUCTS]
+else:
+    catalog, index = catalog_at(version)
+st.caption(f"Catalog v{version}: {len(catalog)} items")
 
 if st.button("✨ Generate Outfit"):
-    sample = prefilter(catalog, quiz)
-    md = compose_outfit(quiz, sample)
+    with span("prefilter", catalog=len(catalog)):
+        sample = prefilter(catalog, quiz, index=index)
+    with span("compose outfit"):
+        st.session_state["outfit"] = (compose_outfit(quiz, sample), sample)
+    st.session_state["grid_page"] = 1
+
+# Kept in session state so paging through the grid doesn't regenerate the outfit
+if "outfit" in st.session_state:
+    md, sample = st.session_state["outfit"]
     st.markdown(md)
 
     st.subheader("Items considered")
+    per_page = 6
+    pages = max(1, -(-len(sample) // per_page))
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="grid_page") if pages > 1 else 1
     cols = st.columns(3)
-    for i, it in enumerate(sample):
+    # Only the tiles on this page are fetched/decoded; thumbnails come from the disk cache
+    for i, it in enumerate(sample[page_slice(len(sample), int(page), per_page)]):
         with cols[i % 3]:
-            if it.get("image"):
-                st.image(it["image"], use_column_width=True)
+            with span("thumbnail"):
+                thumb = thumbnail_path(it.get("image"))
+            if thumb:
+                st.image(thumb, use_column_width=True)
             st.markdown(f"**{it.get('name','')}**")
             st.markdown(f"${it.get('price',0):.2f} — [{it.get('url','(link)')}]({it.get('url','#')})")
+
+end_rerun(trace)
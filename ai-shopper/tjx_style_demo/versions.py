@@ -0,0 +1,143 @@
+import contextlib, json, os, threading, time
+from typing import Dict, List, Optional
+
+from .config import CATALOG_CACHE, CATALOG_DELTAS
+
+# Catalog versions
+# ----------------
+# Version 0 is the base snapshot in CATALOG_CACHE, which is never rewritten.
+# Every refresh appends one delta line to CATALOG_DELTAS:
+#   {"version": n, "created": ..., "added": [item, ...], "removed": [key, ...],
+#    "price_changed": [{"key", "old", "new"}, ...], "updated": [item, ...]}
+# Version n = base + deltas 1..n replayed in order.
+# Writers hold deltas_lock() (threads of this process and other processes) from
+# reading the latest version to appending the next one, so versions stay unique.
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+_held: Dict[str, Dict] = {}
+_held_guard = threading.Lock()
+
+def item_key(item: Dict) -> str:
+    return item.get("url") or item.get("name", "")
+
+def empty_delta() -> Dict:
+    return {"added": [], "removed": [], "price_changed": [], "updated": []}
+
+def is_empty(delta: Dict) -> bool:
+    return not any(delta.get(k) for k in ("added", "removed", "price_changed", "updated"))
+
+def diff_catalogs(old: List[Dict], new: List[Dict]) -> Dict:
+    """Delta that turns `old` into `new` (items matched by url)."""
+    before = {item_key(i): i for i in old}
+    after = {item_key(i): i for i in new}
+    delta = empty_delta()
+    for k, it in after.items():
+        prev = before.get(k)
+        if prev is None:
+            delta["added"].append(it)
+            continue
+        if prev.get("price") != it.get("price"):
+            delta["price_changed"].append({"key": k, "old": prev.get("price"), "new": it.get("price")})
+        rest_prev = {f: v for f, v in prev.items() if f != "price"}
+        rest_new = {f: v for f, v in it.items() if f != "price"}
+        if rest_prev != rest_new:
+            delta["updated"].append(it)
+    delta["removed"] = [k for k in before if k not in after]
+    return delta
+
+def apply_delta(catalog: List[Dict], delta: Dict) -> List[Dict]:
+    """New catalog list with `delta` applied (input is not modified)."""
+    removed = set(delta.get("removed", []))
+    prices = {c["key"]: c["new"] for c in delta.get("price_changed", [])}
+    updated = {item_key(i): i for i in delta.get("updated", [])}
+    out = []
+    for it in catalog:
+        k = item_key(it)
+        if k in removed:
+            continue
+        if k in updated:
+            it = dict(updated[k], price=it.get("price"))
+        if k in prices:
+            it = dict(it, price=prices[k])
+        out.append(it)
+    out.extend(delta.get("added", []))
+    return out
+
+@contextlib.contextmanager
+def deltas_lock(path: str = CATALOG_DELTAS):
+    """
+    Exclusive hold on the delta log: a re-entrant lock for this process's
+    threads plus an OS lock on `<path>.lock` for other processes.
+    """
+    with _held_guard:
+        state = _held.setdefault(os.path.abspath(path), {"lock": threading.RLock(), "depth": 0, "file": None})
+    with state["lock"]:
+        if state["depth"] == 0:
+            f = open(path + ".lock", "a+")
+            try:
+                _lock_file(f)
+            except BaseException:
+                f.close()
+                raise
+            state["file"] = f
+        state["depth"] += 1
+        try:
+            yield
+        finally:
+            state["depth"] -= 1
+            if state["depth"] == 0:
+                f, state["file"] = state["file"], None
+                _unlock_file(f)
+                f.close()
+
+def read_deltas(path: str = CATALOG_DELTAS) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        # A line without its newline is still being appended; it is read next time
+        return [json.loads(ln) for ln in f if ln.strip() and ln.endswith("\n")]
+
+def deltas_since(version: int, path: str = CATALOG_DELTAS) -> List[Dict]:
+    return [d for d in read_deltas(path) if d["version"] > version]
+
+def latest_version(path: str = CATALOG_DELTAS) -> int:
+    deltas = read_deltas(path)
+    return deltas[-1]["version"] if deltas else 0
+
+def append_delta(delta: Dict, path: str = CATALOG_DELTAS) -> Dict:
+    """Record `delta` as the next version (append-only)."""
+    with deltas_lock(path):
+        rec = dict(delta, version=latest_version(path) + 1, created=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+    return rec
+
+def load_catalog_version(version: Optional[int] = None,
+                         base_path: str = CATALOG_CACHE,
+                         deltas_path: str = CATALOG_DELTAS) -> List[Dict]:
+    """Catalog as of `version` (None = latest). Old versions stay readable."""
+    with open(base_path, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    for d in read_deltas(deltas_path):
+        if version is not None and d["version"] > version:
+            break
+        catalog = apply_delta(catalog, d)
+    return catalog
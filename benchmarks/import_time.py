@@ -0,0 +1,192 @@
+# import_time.py
+# Cold-start import report for the Streamlit apps and the quiz CLI.
+#
+#   python benchmarks/import_time.py                 # current tree
+#   python benchmarks/import_time.py --rev HEAD~1    # ...and the same files at another git revision
+#   python benchmarks/import_time.py --only app3 --repeat 5 --out imports.json
+#
+# Each target's imports are read from its source (ast) and split into
+#   startup  - module-level imports, paid on cold start and by every fresh process
+#   deferred - imports inside functions or conditional/with blocks, paid on first use
+# and each group is timed with `python -X importtime` in a fresh interpreter
+# (best of --repeat). Deferred modules are timed on top of the startup set, so
+# their cost is what a section adds the first time it is used. With --rev the
+# startup set of the older source is timed too, which is the saving per cold start.
+
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SEARCH_PATH = [os.path.join(ROOT, p) for p in ("streamlit", "ai-shopper", "synthetic", "tests")]
+
+# name -> (path relative to ROOT, package for relative imports)
+TARGETS = {
+    "app2": ("streamlit/app2.py", None),
+    "app3": ("streamlit/app3.py", None),
+    "app4": ("streamlit/app4.py", None),
+    "style_quiz": ("ai-shopper/tjx_style_demo/streamlit_app.py", "tjx_style_demo"),
+    "tjx_style_demo.main": ("ai-shopper/tjx_style_demo/main.py", "tjx_style_demo"),
+}
+
+_MARK = "--import-time-mark--"
+
+
+# =========================
+# Classify imports
+# =========================
+def _source(path, rev=None):
+    if rev is None:
+        with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+            return f.read()
+    return subprocess.run(["git", "show", f"{rev}:{path}"], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def _is_type_checking(node):
+    t = node.test
+    return (isinstance(t, ast.Name) and t.id == "TYPE_CHECKING") or \
+           (isinstance(t, ast.Attribute) and t.attr == "TYPE_CHECKING")
+
+
+def classify_imports(source, package=None):
+    """(startup, deferred): absolute module names imported at module level vs. lazily."""
+    startup, deferred = [], []
+
+    def add(names, lazy):
+        bucket = deferred if lazy else startup
+        for n in names:
+            if n and n not in startup and n not in bucket:
+                bucket.append(n)
+
+    def visit(node, lazy):
+        if isinstance(node, ast.Import):
+            add([a.name for a in node.names], lazy)
+        elif isinstance(node, ast.ImportFrom):
+            name = node.module or ""
+            if node.level:
+                if package is None:
+                    return
+                name = importlib.util.resolve_name("." * node.level + name, package)
+            add([name], lazy)
+        elif isinstance(node, ast.If) and _is_type_checking(node):
+            return  # never executed at runtime
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            for child in ast.iter_child_nodes(node):
+                visit(child, True)
+        elif isinstance(node, (ast.If, ast.With, ast.AsyncWith, ast.For, ast.While)):
+            for child in ast.iter_child_nodes(node):
+                visit(child, True)
+        else:  # module body, try/except (guarded imports still run at startup), class bodies
+            for child in ast.iter_child_nodes(node):
+                visit(child, lazy)
+
+    visit(ast.parse(source), False)
+    return startup, [d for d in deferred if d not in startup]
+
+
+# =========================
+# Measure
+# =========================
+_SCRIPT = """
+import importlib, json, sys
+pre, mods = json.loads(sys.argv[1])
+missing = []
+for m in pre:
+    try:
+        importlib.import_module(m)
+    except BaseException:
+        pass
+sys.stderr.write({mark!r} + "\\n")
+sys.stderr.flush()
+for m in mods:
+    try:
+        importlib.import_module(m)
+    except BaseException:
+        missing.append(m)
+print(json.dumps(missing))
+""".format(mark=_MARK)
+
+
+def measure(mods, pre=(), repeat=3):
+    """Milliseconds to import `mods` in a fresh interpreter that already imported `pre`."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(SEARCH_PATH + [env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    best, missing = None, []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _SCRIPT, json.dumps([list(pre), list(mods)])],
+                              cwd=ROOT, env=env, capture_output=True, text=True)
+        lines = proc.stderr.split(_MARK, 1)[-1].splitlines()
+        total_us = 0
+        for ln in lines:
+            if ln.startswith("import time:") and "|" in ln:
+                self_us = ln.split(":", 1)[1].split("|")[0].strip()
+                if self_us.isdigit():
+                    total_us += int(self_us)
+        try:
+            missing = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            missing = list(mods)
+        best = total_us if best is None else min(best, total_us)
+    return round(best / 1000, 1), missing
+
+
+def report(names, rev=None, repeat=3):
+    out = []
+    for name in names:
+        path, package = TARGETS[name]
+        startup, deferred = classify_imports(_source(path), package)
+        ms, missing = measure(startup, repeat=repeat)
+        row = {"target": name, "startup_ms": ms, "startup": startup, "missing": missing, "deferred": []}
+        for mod in deferred:
+            d_ms, d_missing = measure([mod], pre=startup, repeat=repeat)
+            row["deferred"].append({"module": mod, "first_use_ms": d_ms, "missing": bool(d_missing)})
+        if rev is not None:
+            try:
+                old, _ = classify_imports(_source(path, rev), package)
+            except subprocess.CalledProcessError:
+                old = None
+            if old is not None:
+                row["rev"] = rev
+                row["rev_startup_ms"], _ = measure(old, repeat=repeat)
+                row["saved_ms"] = round(row["rev_startup_ms"] - ms, 1)
+        out.append(row)
+        _print_row(row)
+    return out
+
+
+def _print_row(r):
+    line = f"{r['target']:<22} startup {r['startup_ms']:>8.1f} ms  ({len(r['startup'])} imports)"
+    if "rev_startup_ms" in r:
+        line += f"   {r['rev']}: {r['rev_startup_ms']:.1f} ms  saved {r['saved_ms']:+.1f} ms"
+    print(line)
+    if r["missing"]:
+        print(f"{'':<22} could not import: {', '.join(r['missing'])}")
+    for d in sorted(r["deferred"], key=lambda d: -d["first_use_ms"]):
+        note = "  (could not import)" if d["missing"] else ""
+        print(f"{'':<22}   deferred {d['module']:<28} {d['first_use_ms']:>8.1f} ms on first use{note}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Report cold-start import time of the apps (python -X importtime).")
+    ap.add_argument("--only", default="", help="substring filter on target names")
+    ap.add_argument("--rev", default=None, help="also time the startup imports of this git revision")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=None, help="write the report as JSON")
+    args = ap.parse_args(argv)
+
+    names = [n for n in TARGETS if args.only in n]
+    rows = report(names, rev=args.rev, repeat=args.repeat)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
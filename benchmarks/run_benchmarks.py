@@ -0,0 +1,300 @@
+# run_benchmarks.py
+# Performance regression harness for the explorer, outfit and cart hot paths.
+#
+#   python benchmarks/run_benchmarks.py --save-baseline          # first run on a machine: store the baseline
+#   python benchmarks/run_benchmarks.py                          # run, print, compare, write results JSON
+#   python benchmarks/run_benchmarks.py --tolerance 0.3          # fail if >30% slower than baseline
+#   python benchmarks/run_benchmarks.py --only read_table --scales 1e5,1e6
+#
+# Timings only compare on the same machine, so baseline.json is not committed:
+# record one with --save-baseline before the first comparison (without it the
+# run only prints and writes results).
+#
+# Each (case, scale) runs in a fresh process. Setup (building the input data)
+# is neither timed nor measured; the timed body is repeated and the best wall
+# time is kept, then the body runs once more under tracemalloc for its peak
+# allocation (numpy/pandas buffers included, setup data excluded). Results
+# record wall time, rows/s and peak allocated MB.
+# Exit code 1 means at least one case errored or regressed beyond --tolerance.
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in ("streamlit", "synthetic", "ai-shopper", "tests"):
+    sys.path.insert(0, os.path.join(ROOT, p))
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_RESULTS = os.path.join(HERE, "results.json")
+
+CASES = {}
+
+
+def case(name):
+    """Register `setup(scale) -> run`; only the returned `run() -> rows` is timed."""
+    def deco(setup):
+        CASES[name] = setup
+        return setup
+    return deco
+
+
+# =========================
+# Input data (synthetic/generate.py at the requested scale)
+# =========================
+def _tables(n):
+    from generate import customer_weights, gen_customers, gen_products, gen_transactions, plan
+
+    sizes = plan(n, shard_rows=max(n, 1))
+    prices = gen_products(0, sizes["products"])["retail_price"].to_numpy()
+    cust_p = customer_weights(0, sizes["customers"], sizes["shard_rows"])
+    tx, items, _ = gen_transactions(0, 0, 0, n, sizes, prices, cust_p)
+    customers = gen_customers(0, 0, 0, sizes["customers"])
+    return tx, items, customers
+
+
+class _Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile (has .name and .getvalue())."""
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+# =========================
+# Cases
+# =========================
+@case("read_table.clean")
+def _read_clean(n):
+    from explorer import read_table_safely
+
+    tx, _, _ = _tables(n)
+    raw = tx.to_csv(index=False).encode("utf-8")
+    return lambda: len(read_table_safely(_Upload(raw, "transactions.csv"))[0])
+
+
+@case("read_table.messy")
+def _read_messy(n):
+    """Semicolons, cp1252 bytes and some over-long lines: exercises the sniff/encoding fallbacks."""
+    from explorer import read_table_safely
+
+    tx, _, _ = _tables(n)
+    tx["card_bank"] = tx["card_bank"].where(tx.index % 7 != 0, "Crédit Mutuel")
+    text = tx.to_csv(index=False, sep=";")
+    lines = text.splitlines()
+    for i in range(5, len(lines), 997):
+        lines[i] += ";extra;fields"
+    raw = "\n".join(lines).encode("cp1252")
+    return lambda: len(read_table_safely(_Upload(raw, "transactions_messy.txt"))[0])
+
+
+@case("app3.pipeline")
+def _pipeline(n):
+    """prepare → merge customers → date/segment filter → KPIs → monthly resample → KPI by segment."""
+    from explorer import (compute_kpis, filter_rows, kpi_by_category, merge_customers,
+                          prepare_transactions, revenue_over_time)
+
+    tx, _, customers = _tables(n)
+    tx["order_date"] = tx["order_date"].astype(str)  # as parsed from CSV
+
+    def run():
+        t = prepare_transactions(tx.copy(), "order_date", "total_amount")
+        merged, _ = merge_customers(t, customers.copy(), "customer_id", "customer_id", "left")
+        data = filter_rows(merged, "2024-02-01", "2024-11-30", "customer_segment", "High-Value")
+        compute_kpis(data, "total_amount", "transaction_id", "customer_id")
+        revenue_over_time(data, "total_amount", "M")
+        kpi_by_category(merged, "customer_segment", "total_amount")
+        return len(merged)
+    return run
+
+
+@case("app2.streaming_stats")
+def _streaming_stats(n):
+    """Chunked moments + t-digest + histogram of one column (app2's streaming mode)."""
+    from streaming_stats import summarize_csv
+
+    tx, _, _ = _tables(n)
+    raw = tx.to_csv(index=False).encode("utf-8")
+
+    def run():
+        summarize_csv(io.BytesIO(raw), "total_amount").describe()
+        return len(tx)
+    return run
+
+
+@case("outfit.prefilter_stub")
+def _outfit(n):
+    import random
+    from tjx_style_demo.llm import _stub_outfit, prefilter
+    from tjx_style_demo.quiz import Quiz
+
+    rng = random.Random(0)
+    colors = ["Black", "Cream", "Navy", "Beige", "Red", "Grey", "Olive", "White"]
+    kinds = ["Sweater", "Coat", "Jeans", "Boots", "Tote", "Swim Top", "Scarf", "Tee"]
+    catalog = [{"name": f"{rng.choice(kinds)} - {rng.choice(colors)}", "price": round(rng.uniform(5, 200), 2),
+                "url": f"https://example.com/p/{i}", "image": None} for i in range(n)]
+    quiz = Quiz(season="fall", vibe="cozy", palette="neutrals", budget=150)
+
+    def run():
+        _stub_outfit(quiz, prefilter(catalog, quiz))
+        return len(catalog)
+    return run
+
+
+@case("cart.total_price")
+def _cart(n):
+    from cart import Cart
+
+    skus = [(f"sku-{i % 5000}", 5.0 + (i % 97)) for i in range(n)]
+
+    def run():
+        c = Cart()
+        for name, price in skus:
+            c.add_item(name, price)
+        c.total_items()
+        c.total_price()
+        return n
+    return run
+
+
+@case("cart.batch")
+def _cart_batch(n):
+    """One cart per transaction from the synthetic transaction_items columns."""
+    from cart import carts_from_items
+
+    _, items, _ = _tables(n)
+    cols = [items[c].to_numpy() for c in ("transaction_id", "product_id", "quantity", "unit_price")]
+
+    def run():
+        batch = carts_from_items(*cols)
+        batch.total_items()
+        batch.total_price()
+        return len(items)
+    return run
+
+
+# =========================
+# Runner
+# =========================
+def _peak_alloc_mb(run):
+    """Peak memory allocated while `run()` executes (tracing slows it, so it is not timed)."""
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2**20, 1)
+
+
+def _run_one(args):
+    """Runs in a fresh process: setup, then `repeat` timed calls and one traced call."""
+    name, scale, repeat = args
+    run = CASES[name](scale)
+    times, rows = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = run()
+        times.append(time.perf_counter() - t0)
+    best = min(times)
+    peak = _peak_alloc_mb(run)
+    return {
+        "case": name,
+        "scale": scale,
+        "rows": rows,
+        "wall_s": round(best, 6),
+        "rows_per_s": round(rows / best, 1) if best > 0 else None,
+        "peak_alloc_mb": peak,
+        "repeats": repeat,
+    }
+
+
+def run_all(names, scales, repeat=3):
+    results = []
+    ctx = get_context("spawn")
+    for name in names:
+        for scale in scales:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                try:
+                    r = pool.submit(_run_one, (name, scale, repeat)).result()
+                except Exception as e:  # missing optional deps, OOM at huge scales, ...
+                    r = {"case": name, "scale": scale, "error": f"{type(e).__name__}: {e}"}
+            results.append(r)
+            _print_row(r)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions vs. baseline: wall time or peak allocation above baseline * (1 + tolerance)."""
+    base = {(b["case"], b["scale"]): b for b in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get((r["case"], r["scale"]))
+        if not b or "error" in r or "error" in b:
+            continue
+        for metric in ("wall_s", "peak_alloc_mb"):
+            if b.get(metric) and r.get(metric) is not None and r[metric] > b[metric] * (1 + tolerance):
+                regressions.append({"case": r["case"], "scale": r["scale"], "metric": metric,
+                                    "baseline": b[metric], "current": r[metric],
+                                    "change_%": round(100 * (r[metric] / b[metric] - 1), 1)})
+    return regressions
+
+
+def _print_row(r):
+    if "error" in r:
+        print(f"{r['case']:<24} {r['scale']:>11,}  ERROR {r['error']}")
+    else:
+        print(f"{r['case']:<24} {r['scale']:>11,}  {r['wall_s']:>9.4f}s  {r['rows_per_s'] or 0:>14,.0f} rows/s"
+              f"  {r['peak_alloc_mb']:>8.1f} MB")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the performance benchmarks and compare with a baseline.")
+    ap.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                    help="comma-separated row counts, e.g. 1e4,1e5,1e6")
+    ap.add_argument("--only", default="", help="substring filter on case names")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=DEFAULT_RESULTS)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = +25%%")
+    ap.add_argument("--save-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    scales = [int(float(s)) for s in args.scales.split(",") if s.strip()]
+    names = [n for n in CASES if args.only in n]
+    results = run_all(names, scales, args.repeat)
+    errors = [r for r in results if "error" in r]
+
+    doc = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+           "machine": platform.machine(), "results": results}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"baseline saved → {args.baseline}")
+        return 1 if errors else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; record one first with --save-baseline")
+        return 1 if errors else 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for g in regressions:
+        print(f"REGRESSION {g['case']} @ {g['scale']:,}: {g['metric']} {g['baseline']} → {g['current']} "
+              f"(+{g['change_%']}%)")
+    if errors:
+        print(f"{len(errors)} case(s) failed to run")
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
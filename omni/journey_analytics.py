@@ -0,0 +1,354 @@
+# journey_analytics.py
+# Channel-combination segments over omnichannel-dataset.csv, with bootstrap CIs.
+#
+#   python omni/journey_analytics.py                                  # the bundled dataset
+#   python omni/journey_analytics.py --family channels --boot 500
+#   python omni/journey_analytics.py --synthetic 20_000_000 --workers 8 --out segments.csv
+#
+# The six used_* Yes/No columns are packed into one uint8 bitmask per customer
+# (bit i = CHANNELS[i]), and bopis_order / ship_from_store into a second one.
+# Every segment family (channel combination, journey_type, fulfilment,
+# abandonment stage) is then a small integer code per customer, so all
+# segments of a family come out of a handful of np.bincount calls: customers,
+# conversion rate, AOV (mean order value of completed purchases), mean LTV.
+#
+# Confidence intervals use the Poisson bootstrap (each customer gets a
+# Poisson(1) weight per replicate), which needs no resampled copies and splits
+# into independent replicate batches: batches run across a process pool that
+# memory-maps the packed arrays, rows are processed in blocks, and each
+# fixed-size batch has its own seed, so results do not depend on --workers.
+
+import argparse
+import os
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATASET = os.path.join(HERE, "omnichannel-dataset.csv")
+
+CHANNELS = ("mobile_app", "website", "store", "social", "email", "call_center")
+CHANNEL_LABELS = ("Mobile App", "Website", "Store", "Social", "Email", "Call Center")
+BIT = {c: 1 << i for i, c in enumerate(CHANNELS)}
+
+BOPIS, SHIP_FROM_STORE = 1, 2
+FULFILMENT_LABELS = ("Standard", "BOPIS", "Ship from store", "BOPIS + ship from store")
+
+FAMILIES = ("channels", "journey_type", "fulfilment", "abandonment")
+
+YES_NO = ["purchase_completed", "bopis_order", "ship_from_store", *[f"used_{c}" for c in CHANNELS]]
+USECOLS = ["journey_type", "total_touchpoints", "order_value", "lifetime_value", "purchase_completed",
+           "cart_abandonment_stage", "device_switches", "bopis_order", "ship_from_store",
+           *[f"used_{c}" for c in CHANNELS]]
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << len(CHANNELS))], dtype=np.uint8)
+_MISSING = "(missing)"
+
+
+def channel_label(mask: int) -> str:
+    """'Mobile App + Store' for a channel bitmask."""
+    names = [lbl for i, lbl in enumerate(CHANNEL_LABELS) if mask >> i & 1]
+    return " + ".join(names) if names else "(no channel)"
+
+
+# =========================
+# Packed journeys
+# =========================
+@dataclass
+class Journeys:
+    """One row per customer, column-wise; categorical columns are codes into *_labels."""
+    channels: np.ndarray            # uint8 bitmask over CHANNELS
+    fulfilment: np.ndarray          # uint8: BOPIS | SHIP_FROM_STORE
+    journey_type: np.ndarray        # int16 codes into journey_labels
+    abandonment: np.ndarray         # int16 codes into abandonment_labels
+    completed: np.ndarray           # bool
+    order_value: np.ndarray         # float32
+    lifetime_value: np.ndarray      # float32
+    touchpoints: np.ndarray         # int32
+    device_switches: np.ndarray     # int32
+    journey_labels: List[str] = field(default_factory=list)
+    abandonment_labels: List[str] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def family(self, name: str):
+        """(codes, labels) for a segment family."""
+        if name == "channels":
+            return self.channels, [channel_label(m) for m in range(1 << len(CHANNELS))]
+        if name == "journey_type":
+            return self.journey_type, self.journey_labels
+        if name == "fulfilment":
+            return self.fulfilment, list(FULFILMENT_LABELS)
+        if name == "abandonment":
+            return self.abandonment, self.abandonment_labels
+        raise KeyError(f"unknown segment family {name!r}; expected one of {FAMILIES}")
+
+
+def _yes(s: pd.Series) -> np.ndarray:
+    return (s == "Yes").to_numpy(dtype=bool)
+
+
+def pack_flags(frame: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Yes/No columns → uint8 bitmask (bit i = columns[i] == 'Yes')."""
+    mask = np.zeros(len(frame), dtype=np.uint8)
+    for i, c in enumerate(columns):
+        mask |= _yes(frame[c]).astype(np.uint8) << i
+    return mask
+
+
+def _encode(s: pd.Series, table: Dict[str, int]) -> np.ndarray:
+    """Stable integer codes across chunks: `table` maps label -> code and grows as needed."""
+    codes, uniques = pd.factorize(s)
+    lut = [table.setdefault(str(u), len(table)) for u in uniques]
+    if (codes < 0).any():
+        lut.append(table.setdefault(_MISSING, len(table)))  # index -1 picks it
+    return np.asarray(lut, dtype=np.int16)[codes] if lut else np.zeros(len(s), dtype=np.int16)
+
+
+def _from_frame(df: pd.DataFrame, journey_table: Dict[str, int], stage_table: Dict[str, int]) -> dict:
+    return {
+        "channels": pack_flags(df, [f"used_{c}" for c in CHANNELS]),
+        "fulfilment": pack_flags(df, ["bopis_order", "ship_from_store"]),
+        "journey_type": _encode(df["journey_type"], journey_table),
+        "abandonment": _encode(df["cart_abandonment_stage"], stage_table),
+        "completed": _yes(df["purchase_completed"]),
+        "order_value": pd.to_numeric(df["order_value"], errors="coerce").fillna(0).to_numpy(np.float32),
+        "lifetime_value": pd.to_numeric(df["lifetime_value"], errors="coerce").fillna(0).to_numpy(np.float32),
+        "touchpoints": pd.to_numeric(df["total_touchpoints"], errors="coerce").fillna(0).to_numpy(np.int32),
+        "device_switches": pd.to_numeric(df["device_switches"], errors="coerce").fillna(0).to_numpy(np.int32),
+    }
+
+
+def _assemble(parts: List[dict], journey_table: Dict[str, int], stage_table: Dict[str, int]) -> Journeys:
+    cols = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    return Journeys(**cols, journey_labels=list(journey_table), abandonment_labels=list(stage_table))
+
+
+def from_frame(df: pd.DataFrame) -> Journeys:
+    """Pack an omnichannel-dataset-shaped DataFrame."""
+    jt, st = {}, {}
+    return _assemble([_from_frame(df, jt, st)], jt, st)
+
+
+def load_journeys(path: str = DATASET, chunksize: int = 1_000_000) -> Journeys:
+    """Read only the needed columns, chunk by chunk, packing as we go (the file may start with a BOM)."""
+    jt, st = {}, {}
+    parts = []
+    reader = pd.read_csv(path, encoding="utf-8-sig", usecols=USECOLS, dtype={c: "category" for c in YES_NO},
+                         keep_default_na=False, na_values=[""], chunksize=chunksize)
+    for chunk in reader:  # "None" is a real abandonment stage, hence keep_default_na=False
+        parts.append(_from_frame(chunk, jt, st))
+    if not parts:
+        raise ValueError(f"{path} has no rows")
+    return _assemble(parts, jt, st)
+
+
+# =========================
+# Synthetic customers (scale tests)
+# =========================
+CHANNEL_P = np.array([0.45, 0.60, 0.50, 0.30, 0.40, 0.08])
+JOURNEY_TYPES = ["Store Only", "Digital Only", "Mobile Only", "Social Only", "Email Only", "Cross-Device",
+                 "ROPO", "Showrooming", "Webrooming", "Omnichannel"]
+STAGES = ["None", "Browse", "Cart", "Payment"]
+
+
+def _synthetic_shard(args) -> dict:
+    seed, shard, n = args
+    rng = np.random.default_rng([seed, shard])
+    bits = rng.random((n, len(CHANNELS))) < CHANNEL_P
+    channels = (bits.astype(np.uint8) << np.arange(len(CHANNELS), dtype=np.uint8)).sum(axis=1, dtype=np.uint8)
+    k = _POPCOUNT[channels].astype(np.int32)
+    store = (channels & BIT["store"]) != 0
+
+    mixed = rng.choice([6, 7, 8], size=n, p=[0.5, 0.25, 0.25])  # ROPO / Showrooming / Webrooming
+    journey = np.select(
+        [channels == BIT["store"], channels == BIT["mobile_app"], channels == BIT["social"],
+         channels == BIT["email"], ~store & (k <= 2), ~store, k >= 4],
+        [0, 2, 3, 4, 1, 5, 9],
+        default=mixed,
+    ).astype(np.int16)
+
+    fulfilment = (store & (rng.random(n) < 0.35)).astype(np.uint8) * BOPIS \
+        | (store & (rng.random(n) < 0.2)).astype(np.uint8) * SHIP_FROM_STORE
+    completed = rng.random(n) < np.clip(0.55 + 0.07 * k, 0, 0.97)
+    abandonment = np.where(completed, 0, rng.integers(1, len(STAGES), size=n)).astype(np.int16)
+    order_value = rng.lognormal(4.8, 0.8, size=n).astype(np.float32)
+    lifetime_value = (order_value * (1 + rng.gamma(1.5 + 0.8 * k, 1.2))).astype(np.float32)
+    return {
+        "channels": channels,
+        "fulfilment": fulfilment,
+        "journey_type": journey,
+        "abandonment": abandonment,
+        "completed": completed,
+        "order_value": order_value,
+        "lifetime_value": lifetime_value,
+        "touchpoints": (k + rng.poisson(3, size=n)).astype(np.int32),
+        "device_switches": rng.poisson(0.6 * k).astype(np.int32),
+    }
+
+
+def synthetic_journeys(n: int, seed: int = 0, shard_rows: int = 1_000_000,
+                       workers: Optional[int] = None) -> Journeys:
+    """`n` synthetic customers, generated shard by shard; identical output for any `workers`."""
+    tasks = [(seed, s, min(shard_rows, n - start)) for s, start in enumerate(range(0, n, shard_rows))]
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_synthetic_shard, tasks))
+    else:
+        parts = [_synthetic_shard(t) for t in tasks]
+    return Journeys(**{k: np.concatenate([p[k] for p in parts]) for k in parts[0]},
+                    journey_labels=list(JOURNEY_TYPES), abandonment_labels=list(STAGES))
+
+
+# =========================
+# Segment statistics
+# =========================
+def _sums(codes, k, completed, revenue, ltv, w=None) -> np.ndarray:
+    """(4, k): customers, conversions, revenue of completed orders, LTV total — optionally weighted."""
+    if w is None:
+        return np.stack([np.bincount(codes, minlength=k),
+                         np.bincount(codes, completed, minlength=k),
+                         np.bincount(codes, revenue, minlength=k),
+                         np.bincount(codes, ltv, minlength=k)]).astype(np.float64)
+    return np.stack([np.bincount(codes, w, minlength=k),
+                     np.bincount(codes, w * completed, minlength=k),
+                     np.bincount(codes, w * revenue, minlength=k),
+                     np.bincount(codes, w * ltv, minlength=k)])
+
+
+def _ratios(s: np.ndarray):
+    """conversion_rate, aov, avg_ltv from _sums() output (last two axes (4, k))."""
+    n, conv, rev, ltv = s[..., 0, :], s[..., 1, :], s[..., 2, :], s[..., 3, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return conv / n, rev / conv, ltv / n
+
+
+def segment_stats(j: Journeys, families: Sequence[str] = FAMILIES) -> pd.DataFrame:
+    """Customers, conversion, AOV and LTV for every non-empty segment of each family."""
+    revenue = np.where(j.completed, j.order_value, 0).astype(np.float64)
+    completed = j.completed.astype(np.float64)
+    ltv = j.lifetime_value.astype(np.float64)
+    frames = []
+    for fam in families:
+        codes, labels = j.family(fam)
+        k = len(labels)
+        s = _sums(codes, k, completed, revenue, ltv)
+        conv_rate, aov, avg_ltv = _ratios(s)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tp = np.bincount(codes, j.touchpoints, minlength=k) / s[0]
+            ds = np.bincount(codes, j.device_switches, minlength=k) / s[0]
+        frames.append(pd.DataFrame({
+            "family": fam, "code": np.arange(k), "segment": labels,
+            "customers": s[0].astype(np.int64), "share": s[0] / max(len(j), 1),
+            "conversions": s[1].astype(np.int64), "conversion_rate": conv_rate,
+            "aov": aov, "avg_ltv": avg_ltv, "avg_touchpoints": tp, "avg_device_switches": ds,
+        }))
+    out = pd.concat(frames, ignore_index=True)
+    out = out[out["customers"] > 0]
+    return out.sort_values(["family", "customers"], ascending=[True, False], ignore_index=True)
+
+
+# =========================
+# Bootstrap confidence intervals
+# =========================
+_ARRAYS = ("completed", "revenue", "ltv")
+BOOT_BATCH = 25  # replicates per task; fixed so the seeds (and results) do not depend on the pool size
+
+
+def _boot_task(args) -> np.ndarray:
+    """One replicate batch: (reps, 4, sum of family sizes) weighted sums, from memory-mapped arrays."""
+    arr_dir, fams, seed_seq, reps, block_rows = args
+    load = lambda name: np.load(os.path.join(arr_dir, f"{name}.npy"), mmap_mode="r")
+    completed, revenue, ltv = (load(a) for a in _ARRAYS)
+    codes = {f: load(f"codes_{f}") for f, _ in fams}
+    offsets = np.cumsum([0] + [k for _, k in fams])
+    rng = np.random.default_rng(seed_seq)
+    n = len(completed)
+
+    out = np.zeros((reps, 4, offsets[-1]))
+    for r in range(reps):
+        for lo in range(0, n, block_rows):
+            hi = min(lo + block_rows, n)
+            w = rng.poisson(1.0, hi - lo).astype(np.float64)
+            c, rv, lt = completed[lo:hi], revenue[lo:hi], ltv[lo:hi]
+            for (f, k), off in zip(fams, offsets):
+                out[r, :, off:off + k] += _sums(codes[f][lo:hi], k, c, rv, lt, w)
+    return out
+
+
+def bootstrap_ci(j: Journeys, families: Sequence[str] = FAMILIES, reps: int = 200, alpha: float = 0.05,
+                 seed: int = 0, workers: Optional[int] = None, block_rows: int = 1_000_000) -> pd.DataFrame:
+    """Percentile CIs for conversion_rate, aov and avg_ltv of every segment (Poisson bootstrap)."""
+    fams = [(f, len(j.family(f)[1])) for f in families]
+    batches = [min(BOOT_BATCH, reps - lo) for lo in range(0, reps, BOOT_BATCH)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+
+    with tempfile.TemporaryDirectory(prefix="omni-boot-") as tmp:
+        arrays = {"completed": j.completed.astype(np.float64),
+                  "revenue": np.where(j.completed, j.order_value, 0).astype(np.float64),
+                  "ltv": j.lifetime_value.astype(np.float64)}
+        arrays.update({f"codes_{f}": j.family(f)[0] for f, _ in fams})
+        for name, a in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), a)
+        del arrays
+        tasks = [(tmp, fams, ss, b, block_rows) for b, ss in zip(batches, seeds)]
+        if len(tasks) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                sums = np.concatenate(list(pool.map(_boot_task, tasks)))
+        else:
+            sums = np.concatenate([_boot_task(t) for t in tasks])
+
+    lo_q, hi_q = 100 * alpha / 2, 100 * (1 - alpha / 2)
+    cols = {}
+    for name, stat in zip(("conversion_rate", "aov", "avg_ltv"), _ratios(sums)):
+        with warnings.catch_warnings():  # empty segments are all-NaN; they are dropped by analyze()
+            warnings.simplefilter("ignore", RuntimeWarning)
+            cols[f"{name}_lo"], cols[f"{name}_hi"] = np.nanpercentile(stat, [lo_q, hi_q], axis=0)
+    keys = pd.DataFrame({"family": [f for f, k in fams for _ in range(k)],
+                         "code": np.concatenate([np.arange(k) for _, k in fams])})
+    return pd.concat([keys, pd.DataFrame(cols)], axis=1)
+
+
+def analyze(j: Journeys, families: Sequence[str] = FAMILIES, reps: int = 200, alpha: float = 0.05,
+            seed: int = 0, workers: Optional[int] = None) -> pd.DataFrame:
+    """segment_stats() plus bootstrap CI columns (reps=0 skips the bootstrap)."""
+    stats = segment_stats(j, families)
+    if reps <= 0:
+        return stats
+    ci = bootstrap_ci(j, families, reps=reps, alpha=alpha, seed=seed, workers=workers)
+    return stats.merge(ci, on=["family", "code"], how="left")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Omnichannel segment statistics with bootstrap confidence intervals.")
+    ap.add_argument("--path", default=DATASET)
+    ap.add_argument("--synthetic", type=lambda s: int(float(s.replace("_", ""))), default=0,
+                    help="analyze N synthetic customers instead of --path, e.g. 2e7")
+    ap.add_argument("--family", action="append", choices=FAMILIES, help="repeatable; default: all")
+    ap.add_argument("--boot", type=int, default=200, help="bootstrap replicates (0 = none)")
+    ap.add_argument("--alpha", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", default=None, help="write the table as CSV")
+    args = ap.parse_args(argv)
+
+    j = synthetic_journeys(args.synthetic, args.seed, workers=args.workers) if args.synthetic \
+        else load_journeys(args.path)
+    table = analyze(j, args.family or FAMILIES, reps=args.boot, alpha=args.alpha, seed=args.seed,
+                    workers=args.workers)
+    if args.out:
+        table.to_csv(args.out, index=False)
+    with pd.option_context("display.max_rows", None, "display.width", 200, "display.float_format", "{:,.3f}".format):
+        print(f"{len(j):,} customers")
+        print(table.drop(columns="code").to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,31 +1,97 @@
 # streamlit run app.py
 
+import io
+
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+from data_registry import DataRegistry, dataset_key, render_admin_panel, to_frame
+from streaming_stats import StreamingSummary, plot_hist_kde, summarize_csv
+from tracing import begin_rerun, end_rerun, span
+
+# matplotlib / seaborn are imported where a chart is drawn, not before an upload.
+
+# Uploads above this size default to streaming stats (the whole file is never parsed at once)
+STREAMING_AUTO_MB = 50
+PREVIEW_ROWS = 1000
 
 st.title("Simple Data Explorer")
+trace = begin_rerun("app2")
+
+# One parsed copy of each upload per server process, shared by every session
+@st.cache_resource
+def shared_registry():
+    return DataRegistry()
+
+def load_csv(raw: bytes):
+    with span("parse csv", bytes=len(raw)):
+        return pd.read_csv(io.BytesIO(raw)), {}
+
+# Streaming mode: one column is read in chunks into mergeable summaries
+@st.cache_data(show_spinner="Scanning column…", max_entries=32)
+def column_summary(key: str, col: str, _raw: bytes) -> StreamingSummary:
+    with span("stream column", column=col, bytes=len(_raw)):
+        return summarize_csv(io.BytesIO(_raw), col)
 
 # File upload
 uploaded_file = st.file_uploader("Upload a CSV file", type="csv")
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
-    st.subheader("Data Preview")
-    st.write(df.head())
-
-    # Column selector
-    numeric_cols = df.select_dtypes(include=["float", "int"]).columns
-    col = st.selectbox("Choose a numeric column to plot", numeric_cols)
-
-    # Histogram
-    fig, ax = plt.subplots()
-    sns.histplot(df[col], kde=True, ax=ax)
-    st.pyplot(fig)
-
-    # Summary stats
-    st.subheader("Summary Statistics")
-    st.write(df[col].describe())
+    raw = uploaded_file.getvalue()
+    streaming = st.toggle("Streaming stats (bounded memory)", value=len(raw) > STREAMING_AUTO_MB * 1024 * 1024,
+                          help="Reads only the chosen column, in chunks, and plots from running summaries "
+                               "(Welford moments, t-digest quantiles, fixed-bin histogram).")
+
+    if streaming:
+        with span("parse preview", rows=PREVIEW_ROWS):
+            preview = pd.read_csv(io.BytesIO(raw), nrows=PREVIEW_ROWS)
+        st.subheader("Data Preview")
+        st.write(preview.head())
+
+        numeric_cols = preview.select_dtypes(include=["float", "int"]).columns
+        col = st.selectbox("Choose a numeric column to plot", numeric_cols)
+        if col is not None:
+            summary = column_summary(dataset_key(raw), col, raw)
+
+            # Histogram + KDE from the summary
+            with span("chart: histogram + kde (summary)", bins=len(summary.hist.counts)):
+                import matplotlib.pyplot as plt
+                fig, ax = plt.subplots()
+                plot_hist_kde(summary, ax)
+                ax.set_xlabel(col)
+                st.pyplot(fig)
+
+            st.subheader("Summary Statistics")
+            st.write(summary.describe())
+            st.caption("Quartiles are t-digest estimates."
+                       + (f" {summary.missing:,} non-numeric or empty values skipped." if summary.missing else ""))
+    else:
+        registry = shared_registry()
+        with registry.lease(dataset_key(raw), lambda: load_csv(raw), label=uploaded_file.name) as (table, _):
+            df = to_frame(table)
+            st.subheader("Data Preview")
+            st.write(df.head())
+
+            # Column selector
+            numeric_cols = df.select_dtypes(include=["float", "int"]).columns
+            col = st.selectbox("Choose a numeric column to plot", numeric_cols)
+
+            # Histogram
+            with span("chart: histogram + kde", rows=len(df)):
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+                fig, ax = plt.subplots()
+                sns.histplot(df[col], kde=True, ax=ax)
+                st.pyplot(fig)
+
+            # Summary stats
+            st.subheader("Summary Statistics")
+            with span("describe"):
+                st.write(df[col].describe())
 else:
     st.info("Upload a CSV file to get started.")
+
+with st.sidebar:
+    render_admin_panel(shared_registry())
+
+end_rerun(trace)
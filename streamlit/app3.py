@@ -1,13 +1,22 @@
 # app_join.py
 # Customers + Transactions Explorer (robust parsing, merge status, flexible segment support)
 
-import io, csv, traceback
+import os
+import traceback
+from contextlib import ExitStack
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-from pandas.errors import EmptyDataError, ParserError
+
+from explorer import (
+    read_table_safely, suggest_key, candidate_categoricals,
+    prepare_transactions, merge_customers, filter_rows, compute_kpis, revenue_over_time, kpi_by_category,
+)
+from data_registry import DataRegistry, dataset_key, render_admin_panel, to_frame
+from tracing import begin_rerun, end_rerun, span
+from warehouse_export import EXPORT_DIR, SQLiteLoader, SnowflakeLoader, render_export_panel, snowflake_connect
+
+# matplotlib / seaborn are imported where a chart is drawn: they are the slowest
+# imports here and are not needed until a transactions file is loaded.
 
 # =========================
 # Page / safety
@@ -15,140 +24,41 @@ from pandas.errors import EmptyDataError, ParserError
 st.set_page_config(page_title="Customers + Transactions Explorer", layout="wide")
 st.set_option("client.showErrorDetails", True)
 st.title("Customers + Transactions Explorer")
+trace = begin_rerun("app3")
 
 # =========================
-# Robust file loader
+# Shared dataset cache (one parsed copy per server process)
 # =========================
-def read_table_safely(
-    file,
-    nrows=None,
-    sep_choice="auto",
-    header_choice="first row is header",
-    encoding_choice="utf-8",
-):
-    """Robust reader for CSV/TSV/TXT and XLSX (handles BOM, cp1252, sniffed delimiters)."""
-    if file is None:
-        return None, "No file provided.", {}
-
-    name = getattr(file, "name", "")
+@st.cache_resource
+def shared_registry() -> DataRegistry:
+    return DataRegistry()
+
+class _ParseFailed(Exception):
+    """Carries read_table_safely's (df, err, diag) out of the registry loader; nothing is cached."""
+    def __init__(self, result):
+        super().__init__(result[1])
+        self.result = result
+
+def read_table_shared(file, leases: ExitStack, **opts):
+    """Like read_table_safely, but each upload is parsed once per server process and
+    shared (read-only) by every session; the dataset stays pinned until `leases` closes."""
     raw = file.getvalue() if hasattr(file, "getvalue") else None
-    diag = {
-        "name": name,
-        "size_bytes": len(raw) if isinstance(raw, (bytes, bytearray)) else None,
-        "head_bytes": (raw[:2048] if isinstance(raw, (bytes, bytearray)) else None),
-        "sniff_delimiter": None,
-        "sniff_has_header": None,
-    }
-
-    # Excel/ZIP and PDF guards
-    if isinstance(raw, (bytes, bytearray)):
-        if raw[:2] == b"PK":
-            try:
-                return pd.read_excel(io.BytesIO(raw), nrows=nrows), None, diag
-            except Exception as e:
-                return None, f"File looks like Excel (zip) but failed to open: {e}", diag
-        if raw[:4] == b"%PDF":
-            return None, "This is a PDF, not a CSV/TSV.", diag
-
-    # Excel by extension
-    if name.lower().endswith((".xlsx", ".xls")):
-        try:
-            return pd.read_excel(file, nrows=nrows), None, diag
-        except Exception as e:
-            return None, f"Failed to read Excel: {e}", diag
-
-    sep_map = {"auto": None, "comma (,)": ",", "tab (\\t)": "\t", "semicolon (;)": ";", "pipe (|)": "|"}
-    sep = sep_map.get(sep_choice, None)
-    hdr = 0 if header_choice == "first row is header" else None
-
-    # Sniff if auto
-    sniff_sep = None
-    sniff_has_header = None
-    if isinstance(raw, (bytes, bytearray)) and sep is None:
-        try:
-            sample = raw[:8192].decode(encoding_choice, errors="ignore")
-            sniffer = csv.Sniffer()
-            sniff_sep = sniffer.sniff(sample).delimiter
-            sniff_has_header = sniffer.has_header(sample)
-            diag["sniff_delimiter"] = sniff_sep
-            diag["sniff_has_header"] = sniff_has_header
-        except Exception:
-            pass
-
-    def _try(enc, s):
-        try:
-            return pd.read_csv(
-                io.BytesIO(raw) if isinstance(raw, (bytes, bytearray)) else file,
-                nrows=nrows,
-                sep=s,
-                engine="python",
-                header=hdr,
-                encoding=enc,
-                on_bad_lines="skip",
-            ), None
-        except EmptyDataError:
-            return None, "The file appears to be empty or has no recognizable columns."
-        except ParserError as e:
-            return None, f"Parser error: {e}"
-        except UnicodeDecodeError as e:
-            return None, f"Encoding error: {e}"
-        except Exception as e:
-            return None, f"Read error: {e}"
-
-    # User choice → sniffed → pandas sniff (None)
-    sep_candidates = [sep] if sep is not None else [sniff_sep, None]
-    enc_candidates = [encoding_choice, "utf-8-sig", "utf-8", "cp1252", "latin-1"]
-
-    for enc in enc_candidates:
-        for s in sep_candidates:
-            df, err = _try(enc, s)
-            if err is None and isinstance(df, pd.DataFrame) and len(df.columns) > 0:
-                return df, None, diag
-
-    # Brute-force fallbacks
-    for enc in ["utf-8-sig", "cp1252", "latin-1"]:
-        for s in [",", "\t", ";", "|"]:
-            df, err = _try(enc, s)
-            if err is None and isinstance(df, pd.DataFrame) and len(df.columns) > 0:
-                return df, None, diag
-
-    return None, "Unable to parse the file. Adjust delimiter/header/encoding.", diag
-
-# =========================
-# Helpers
-# =========================
-def norm(s: str) -> str:
-    s = str(s)
-    return "".join(s.strip().lower().replace("_", "").split())
-
-def suggest_key(cols):
-    candidates = ["customer_id", "customerid", "cust_id", "custid", "cid", "user_id", "userid", "person_id", "personid"]
-    ncols = {norm(c): c for c in cols}
-    for c in candidates:
-        if c in ncols:
-            return ncols[c]
-    for c in cols:
-        if norm(c).endswith("id"):
-            return c
-    return cols[0] if cols else None
-
-def candidate_categoricals(df: pd.DataFrame, extra: list[str] | None = None, max_uniques: int = 50) -> list[str]:
-    cols = []
-    if df is None or df.empty:
-        return cols
-    for c in df.columns:
-        if df[c].dtype == "object":
-            try:
-                nun = df[c].nunique(dropna=True)
-                if 1 < nun <= max_uniques:
-                    cols.append(c)
-            except Exception:
-                pass
-    if extra:
-        for c in extra:
-            if c in df.columns and c not in cols:
-                cols.append(c)
-    return cols
+    if not isinstance(raw, (bytes, bytearray)):
+        return read_table_safely(file, **opts)
+
+    def load():
+        df, err, diag = read_table_safely(file, **opts)
+        if err or not isinstance(df, pd.DataFrame):
+            raise _ParseFailed((df, err, diag))
+        return df, diag
+
+    registry = shared_registry()
+    key = dataset_key(raw, sorted(opts.items()))
+    try:
+        table, diag = leases.enter_context(registry.lease(key, load, label=getattr(file, "name", "")))
+    except _ParseFailed as e:
+        return e.result
+    return to_frame(table), None, diag
 
 # =========================
 # UI — Uploads & parsing options
@@ -173,13 +83,15 @@ with st.sidebar:
 
 if tx_file is None:
     st.info("Waiting for a transactions file…")
+    end_rerun(trace)  # st.stop() ends the script before the bottom one
     st.stop()
 
 # Peek columns for dropdowns
-tx_peek, _, _ = read_table_safely(tx_file, nrows=1, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
-cust_peek, _, _ = (None, None, None)
-if cust_file:
-    cust_peek, _, _ = read_table_safely(cust_file, nrows=1, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
+with span("peek columns"):
+    tx_peek, _, _ = read_table_safely(tx_file, nrows=1, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
+    cust_peek, _, _ = (None, None, None)
+    if cust_file:
+        cust_peek, _, _ = read_table_safely(cust_file, nrows=1, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
 
 tx_cols_peek = list(tx_peek.columns) if isinstance(tx_peek, pd.DataFrame) else []
 cust_cols_peek = list(cust_peek.columns) if isinstance(cust_peek, pd.DataFrame) else []
@@ -208,12 +120,27 @@ with st.sidebar:
 
     merge_how = st.selectbox("Merge type", ["left (keep all transactions)", "inner (only matched)"], index=0)
 
+# =========================
+# Warehouse write-back targets
+# =========================
+def export_targets():
+    """Local SQLite always; Snowflake when `.streamlit/secrets.toml` has a [snowflake] block."""
+    targets = {"SQLite (local file)": lambda: SQLiteLoader(os.path.join(EXPORT_DIR, "warehouse.db"))}
+    try:
+        sf_cfg = dict(st.secrets.get("snowflake", {}))
+    except Exception:
+        sf_cfg = {}
+    if sf_cfg:
+        targets["Snowflake"] = lambda: SnowflakeLoader(lambda: snowflake_connect(sf_cfg))
+    return targets
+
 # =========================
 # Main app (guarded)
 # =========================
-def main():
+def main(leases: ExitStack):
     # Load full transactions
-    tx, tx_err, tx_diag = read_table_safely(tx_file, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
+    with span("load transactions"):
+        tx, tx_err, tx_diag = read_table_shared(tx_file, leases, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
 
     with st.expander("File diagnostics (transactions)"):
         st.write({k: tx_diag.get(k) for k in ["name", "size_bytes", "sniff_delimiter", "sniff_has_header"]})
@@ -229,15 +156,8 @@ def main():
         return
 
     # Basic typing
-    if tx_date in tx.columns:
-        tx["_tx_dt"] = pd.to_datetime(tx[tx_date], errors="coerce", infer_datetime_format=True)
-    else:
-        tx["_tx_dt"] = pd.NaT
-
-    if tx_rev in tx.columns:
-        tx[tx_rev] = pd.to_numeric(tx[tx_rev], errors="coerce")
-
-    tx = tx.drop_duplicates()
+    with span("prepare", rows=len(tx)):
+        tx = prepare_transactions(tx, tx_date, tx_rev)
     merged = tx.copy()
     used_customers = False
     merge_stats = {}
@@ -245,7 +165,8 @@ def main():
     # Load/merge customers (optional)
     cust = None
     if cust_file:
-        cust, cust_err, cust_diag = read_table_safely(cust_file, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
+        with span("load customers"):
+            cust, cust_err, cust_diag = read_table_shared(cust_file, leases, sep_choice=sep_choice, header_choice=header_choice, encoding_choice=encoding_choice)
 
         with st.expander("File diagnostics (customers)"):
             st.write({k: cust_diag.get(k) for k in ["name", "size_bytes", "sniff_delimiter", "sniff_has_header"]})
@@ -264,19 +185,11 @@ def main():
             if missing:
                 st.warning(" / ".join(missing) + " — update the key dropdowns in the sidebar.")
             else:
-                merged[tx_key] = merged[tx_key].astype("string")
-                cust[cust_key] = cust[cust_key].astype("string")
                 how = "left" if merge_how.startswith("left") else "inner"
-                merged = merged.merge(cust, left_on=tx_key, right_on=cust_key, how=how, suffixes=("", "_cust"))
+                with span("merge", how=how):
+                    merged, merge_stats = merge_customers(tx, cust, tx_key, cust_key, how)
                 used_customers = True
 
-                # Merge status: matched vs unmatched
-                merge_stats["transactions"] = len(tx)
-                merge_stats["customers"] = cust[cust_key].nunique()
-                merge_stats["matched_rows"] = merged[tx_key].notna().sum()
-                merge_stats["matched_customers"] = merged[cust_key].notna().sum() if cust_key in merged.columns else np.nan
-                merge_stats["coverage_%"] = round(100 * merge_stats["matched_rows"] / max(1, merge_stats["transactions"]), 2)
-
     # Merge status panel
     with st.container():
         cols = st.columns(4)
@@ -326,20 +239,14 @@ def main():
             chosen_val = st.selectbox(f"{chosen_cat} value", vals, index=0)
 
     # Apply filters
-    mask = pd.Series(True, index=merged.index)
-    if start and end and "_tx_dt" in merged.columns:
-        mask &= merged["_tx_dt"].between(pd.to_datetime(start), pd.to_datetime(end))
-    if chosen_cat != "(None)" and chosen_val and chosen_val != "(All)":
-        mask &= merged[chosen_cat].astype(str).eq(chosen_val)
-
-    data = merged.loc[mask].copy()
+    with span("filter", rows=len(merged)):
+        data = filter_rows(merged, start, end, chosen_cat, chosen_val)
 
     # KPIs
     k1, k2, k3, k4 = st.columns(4)
-    total_rev = np.nansum(data[tx_rev]) if tx_rev in data.columns else np.nan
-    tx_count = len(data[tx_id].dropna()) if tx_id in data.columns else len(data)
-    unique_cust = data[tx_key].nunique() if tx_key in data.columns else np.nan
-    aov = (total_rev / tx_count) if tx_count and not np.isnan(total_rev) else np.nan
+    with span("kpis"):
+        kpi = compute_kpis(data, tx_rev, tx_id, tx_key)
+    total_rev, tx_count, unique_cust, aov = kpi["total_rev"], kpi["tx_count"], kpi["unique_cust"], kpi["aov"]
 
     k1.metric("Total Revenue", f"${total_rev:,.2f}" if pd.notna(total_rev) else "—")
     k2.metric("Transactions", f"{tx_count:,}")
@@ -356,19 +263,15 @@ def main():
         freq_code = freq.split(" - ")[0][0]  # D/W/M
 
     if "_tx_dt" in data.columns and tx_rev in data.columns and data["_tx_dt"].notna().any():
-        ts = (
-            data[["_tx_dt", tx_rev]]
-            .dropna(subset=["_tx_dt", tx_rev])
-            .set_index("_tx_dt")
-            .sort_index()
-            .resample(freq_code)[tx_rev]
-            .sum()
-        )
-        fig1, ax1 = plt.subplots()
-        ts.plot(ax=ax1)
-        ax1.set_ylabel("Revenue")
-        ax1.set_xlabel("Date")
-        st.pyplot(fig1)
+        with span("resample", freq=freq_code):
+            ts = revenue_over_time(data, tx_rev, freq_code)
+        with span("chart: revenue over time"):
+            import matplotlib.pyplot as plt
+            fig1, ax1 = plt.subplots()
+            ts.plot(ax=ax1)
+            ax1.set_ylabel("Revenue")
+            ax1.set_xlabel("Date")
+            st.pyplot(fig1)
     else:
         st.info("Select the correct date and revenue columns in the sidebar to plot the time series.")
 
@@ -376,7 +279,7 @@ def main():
 
     # Chart 2: Distribution / Relationship
     st.subheader("Distribution / Relationship")
-    num_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    num_cols = data.select_dtypes(include="number").columns.tolist()
     mode = st.radio("Chart type", ["Boxplot (distribution)", "Scatter (relationship)"], horizontal=True)
 
     if mode == "Boxplot (distribution)":
@@ -384,21 +287,27 @@ def main():
             st.info("No numeric columns found.")
         else:
             ycol = st.selectbox("Numeric column", num_cols, index=0)
-            fig2, ax2 = plt.subplots()
-            sns.boxplot(y=data[ycol], ax=ax2)
-            ax2.set_ylabel(ycol)
-            st.pyplot(fig2)
+            with span("chart: boxplot"):
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+                fig2, ax2 = plt.subplots()
+                sns.boxplot(y=data[ycol], ax=ax2)
+                ax2.set_ylabel(ycol)
+                st.pyplot(fig2)
     else:
         if len(num_cols) < 2:
             st.info("Need at least two numeric columns for a scatter plot.")
         else:
             xcol = st.selectbox("X", num_cols, index=0)
             ycol = st.selectbox("Y", num_cols, index=1)
-            fig3, ax3 = plt.subplots()
-            sns.scatterplot(x=data[xcol], y=data[ycol], ax=ax3)
-            ax3.set_xlabel(xcol)
-            ax3.set_ylabel(ycol)
-            st.pyplot(fig3)
+            with span("chart: scatter"):
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+                fig3, ax3 = plt.subplots()
+                sns.scatterplot(x=data[xcol], y=data[ycol], ax=ax3)
+                ax3.set_xlabel(xcol)
+                ax3.set_ylabel(ycol)
+                st.pyplot(fig3)
 
     # KPI by Category (defaults to customer_segment if present)
     st.divider()
@@ -411,12 +320,8 @@ def main():
                 default_idx = seg_choices.index(pref)
                 break
         seg_col = st.selectbox("Category column", seg_choices, index=default_idx)
-        seg = (
-            data.groupby(seg_col, dropna=False)[tx_rev]
-            .agg(total_revenue="sum", transactions="size", aov=lambda s: s.sum() / len(s))
-            .reset_index()
-            .sort_values("total_revenue", ascending=False)
-        )
+        with span("groupby category", column=seg_col):
+            seg = kpi_by_category(data, seg_col, tx_rev)
         st.dataframe(seg, use_container_width=True)
     else:
         st.caption("Upload customers.csv (and/or choose a different revenue column) to enable KPI by category.")
@@ -425,9 +330,19 @@ def main():
     with st.expander("Preview merged data"):
         st.dataframe(data.head(50), use_container_width=True)
 
+    # Write-back
+    with st.expander("Export filtered data to a warehouse"):
+        render_export_panel(data, export_targets(), key="app3_export")
+
+    with st.sidebar:
+        render_admin_panel(shared_registry())
+
 # Guard — never silently blank-screen
 try:
-    main()
+    with ExitStack() as leases:
+        main(leases)
 except Exception:
     st.error("Unexpected error (details below).")
     st.code(traceback.format_exc(), language="python")
+
+end_rerun(trace)
@@ -1,6 +1,8 @@
 # app_snowflake.py
 # Streamlit <-> Snowflake: connector (SQL+pandas) + optional Snowpark in one app.
 
+import importlib.util
+import os
 import time
 import traceback
 from typing import Optional, Dict
@@ -8,10 +10,14 @@ from typing import Optional, Dict
 import pandas as pd
 import streamlit as st
 
-# Try to import both client libraries gracefully
+from explorer import read_table_safely
+from tracing import begin_rerun, end_rerun, span
+from warehouse_export import EXPORT_DIR, SQLiteLoader, SnowflakeLoader, render_export_panel
+
+# Check for the client libraries without importing them: snowflake.connector
+# is only loaded when a connection is actually opened (see connector_connect).
 try:
-    import snowflake.connector as sf
-    HAVE_CONNECTOR = True
+    HAVE_CONNECTOR = importlib.util.find_spec("snowflake.connector") is not None
 except Exception:
     HAVE_CONNECTOR = False
 
@@ -27,6 +33,7 @@ except Exception:
 st.set_page_config(page_title="Streamlit ↔ Snowflake", layout="wide")
 st.set_option("client.showErrorDetails", True)
 st.title("Streamlit ↔ Snowflake")
+trace = begin_rerun("app4")
 
 st.caption(
     "Demo: connect with the Snowflake Python Connector (SQL → pandas), "
@@ -77,6 +84,7 @@ def connector_connect(cfg: Dict[str, str]):
     """Create a Snowflake connection via snowflake-connector-python."""
     if not HAVE_CONNECTOR:
         raise RuntimeError("snowflake-connector-python is not installed. `pip install snowflake-connector-python`")
+    import snowflake.connector as sf
     return sf.connect(
         account=cfg["account"],
         user=cfg["user"],
@@ -158,6 +166,7 @@ if clear_cache:
 
 if not is_complete(conn_cfg):
     st.warning("Enter your Snowflake credentials in the sidebar (or configure `.streamlit/secrets.toml`).")
+    end_rerun(trace)  # st.stop() ends the script before the bottom one
     st.stop()
 
 # =========================
@@ -197,7 +206,8 @@ if not HAVE_CONNECTOR:
 else:
     # Lists for DB/SCHEMA/TABLE selection
     try:
-        dbs = run_sql_cached(conn_cfg, "SHOW DATABASES").sort_values("name", key=lambda s: s.str.lower())
+        with span("sql fetch: databases"):
+            dbs = run_sql_cached(conn_cfg, "SHOW DATABASES").sort_values("name", key=lambda s: s.str.lower())
         db = st.selectbox("Database", dbs["name"].tolist(), index=max(dbs.index[dbs["name"].str.upper()==conn_cfg["database"].upper()].tolist()+[0]))
         schemas = run_sql_cached(conn_cfg, f"SHOW SCHEMAS IN DATABASE {db}")
         schema = st.selectbox("Schema", schemas["name"].tolist(), index=max(schemas.index[schemas["name"].str.upper()==conn_cfg["schema"].upper()].tolist()+[0]))
@@ -206,7 +216,8 @@ else:
         preview_btn = st.button("Preview table", type="primary")
         if preview_btn and table and table != "(none)":
             t0 = time.time()
-            df = run_sql_live(conn_cfg, f'SELECT * FROM "{db}"."{schema}"."{table}" LIMIT 500')
+            with span("sql fetch: preview", table=f"{db}.{schema}.{table}"):
+                df = run_sql_live(conn_cfg, f'SELECT * FROM "{db}"."{schema}"."{table}" LIMIT 500')
             dur = time.time() - t0
             st.caption(f"Fetched {len(df):,} rows in {dur:.2f}s")
             st.dataframe(df, use_container_width=True)
@@ -234,12 +245,15 @@ run_btn = st.button("Run query")
 if run_btn and sql.strip():
     try:
         t0 = time.time()
-        if mode.startswith("Connector"):
-            df = run_sql_cached(conn_cfg, sql) if run_cached else run_sql_live(conn_cfg, sql)
-        else:
-            s = snowpark_session(conn_cfg)
-            df = s.sql(sql).to_pandas()
-            s.close()
+        with span("sql fetch: ad-hoc", cached=run_cached) as sp:
+            if mode.startswith("Connector"):
+                df = run_sql_cached(conn_cfg, sql) if run_cached else run_sql_live(conn_cfg, sql)
+            else:
+                s = snowpark_session(conn_cfg)
+                df = s.sql(sql).to_pandas()
+                s.close()
+            if sp is not None:
+                sp.attrs["rows"] = len(df)
         dur = time.time() - t0
         st.caption(f"Returned {len(df):,} rows in {dur:.2f}s")
         st.dataframe(df, use_container_width=True)
@@ -250,6 +264,27 @@ if run_btn and sql.strip():
 
 st.divider()
 
+# =========================
+# Bulk load (write-back)
+# =========================
+st.subheader("Bulk load a file into a table")
+st.caption("Writes compressed Parquet chunks, PUTs them to a stage in parallel and loads them with COPY INTO.")
+upload = st.file_uploader("CSV / TSV / XLSX to load", type=["csv", "tsv", "txt", "xlsx", "xls"], key="bulk_upload")
+if upload is not None:
+    with span("parse upload", file=upload.name):
+        up_df, up_err, _ = read_table_safely(upload)
+    if up_err:
+        st.error(up_err)
+    else:
+        targets = {}
+        if HAVE_CONNECTOR:
+            targets["Snowflake"] = lambda: SnowflakeLoader(lambda: connector_connect(conn_cfg))
+        targets["SQLite (local file)"] = lambda: SQLiteLoader(os.path.join(EXPORT_DIR, "warehouse.db"))
+        default_table = os.path.splitext(upload.name)[0].upper().replace("-", "_").replace(" ", "_")
+        render_export_panel(up_df, targets, key="app4_export", default_table=default_table)
+
+st.divider()
+
 # =========================
 # Quick How-To / Notes
 # =========================
@@ -266,9 +301,12 @@ with st.expander("How this works / Tips"):
 **Performance**
 - Use `st.cache_data(ttl=60)` for stable, repeated queries (schema lists, small lookups).
 - For large tables, filter in SQL (`WHERE`, `LIMIT`) before bringing into pandas.
+- For writes, use the bulk load section (Parquet + PUT + COPY INTO) rather than row-by-row INSERTs.
 
 **Common gotchas**
 - `account` should include region (e.g., `xy12345.us-west-2`), **not** the full URL.
 - Make sure `role`, `warehouse`, `database`, `schema` exist and you have usage grants.
 - If Snowpark is not installed, the UI falls back to Connector mode.
 """)
+
+end_rerun(trace)
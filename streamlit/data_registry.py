@@ -0,0 +1,268 @@
+# data_registry.py
+# Process-wide shared dataset registry for the Streamlit apps.
+#
+# Every browser session of app2/app3 used to parse and hold its own copy of the
+# same upload. The registry keeps each parsed dataset ONCE per server process as
+# an immutable Arrow table, hands sessions read-only views of it, counts who is
+# using what, and evicts idle datasets (least recently used first) when the
+# configured memory cap is exceeded.
+#
+# Usage inside an app:
+#
+#     @st.cache_resource
+#     def shared_registry():
+#         return DataRegistry()
+#
+#     with shared_registry().lease(key, loader, label="transactions.csv") as (table, meta):
+#         df = to_frame(table)
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+
+# Memory cap for the whole process, in MB (override with TJX_SHARED_CACHE_MB).
+DEFAULT_CAP_MB = 1024
+
+
+def default_cap_bytes() -> int:
+    try:
+        mb = float(os.getenv("TJX_SHARED_CACHE_MB", DEFAULT_CAP_MB))
+    except ValueError:
+        mb = DEFAULT_CAP_MB
+    return int(mb * 1024 * 1024)
+
+
+def dataset_key(raw: bytes, *parts) -> str:
+    """Content-addressed key: same bytes + same parse options -> same dataset."""
+    h = hashlib.sha1(raw)
+    for p in parts:
+        h.update(b"\x00")
+        h.update(repr(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+@dataclass
+class _Entry:
+    key: str
+    table: pa.Table
+    label: str
+    meta: Dict[str, Any]
+    nbytes: int
+    refs: int = 0
+    hits: int = 0
+    created: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+
+
+class DataRegistry:
+    """Holds each dataset once (as a pyarrow.Table) and shares it across sessions.
+
+    - Tables are immutable, so every session can read the same buffers.
+    - `lease()` bumps a reference count for the duration of a rerun; datasets
+      with live references are never evicted (their buffers are still reachable
+      through the sessions' views, so dropping them would not free memory).
+    - When the resident size exceeds `cap_bytes`, idle datasets are evicted in
+      least-recently-used order.
+    """
+
+    def __init__(self, cap_bytes: Optional[int] = None):
+        self.cap_bytes = default_cap_bytes() if cap_bytes is None else int(cap_bytes)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Per-key [lock, users] so two sessions uploading the same file parse it
+        # once; the entry is dropped when its last user leaves.
+        self._load_locks: Dict[str, list] = {}
+        self.evictions = 0
+
+    # ----- lookup / load -----
+    def get(self, key: str, pin: bool = False) -> Optional[Tuple[pa.Table, Dict[str, Any]]]:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return None
+            e.hits += 1
+            e.last_used = time.time()
+            if pin:
+                e.refs += 1
+            self._entries.move_to_end(key)
+            return e.table, e.meta
+
+    def put(self, key: str, data, label: str = "", meta: Optional[Dict[str, Any]] = None,
+            pin: bool = False) -> Tuple[pa.Table, Dict[str, Any]]:
+        """Register a DataFrame/Table under `key` (reuses the resident copy if there is one)."""
+        hit = self.get(key, pin=pin)
+        if hit is not None:  # already resident: skip the Arrow conversion
+            return hit
+        table = _as_table(data)
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                e = _Entry(key=key, table=table, label=label or key[:12],
+                           meta=dict(meta or {}), nbytes=table.nbytes)
+                self._entries[key] = e
+            if pin:
+                e.refs += 1
+            self._entries.move_to_end(key)
+            self._evict_to_cap(keep=key)
+            return e.table, e.meta
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Tuple[Any, Dict[str, Any]]],
+        label: str = "",
+        pin: bool = False,
+    ) -> Tuple[pa.Table, Dict[str, Any]]:
+        """Return the resident table for `key`, calling `loader()` at most once per key.
+
+        `loader` returns `(data, meta)` where `data` is a DataFrame or Arrow table.
+        """
+        hit = self.get(key, pin=pin)
+        if hit is not None:
+            return hit
+        with self._lock:
+            slot = self._load_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                hit = self.get(key, pin=pin)
+                if hit is not None:
+                    return hit
+                data, meta = loader()
+                return self.put(key, data, label=label, meta=meta, pin=pin)
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0 and self._load_locks.get(key) is slot:
+                    del self._load_locks[key]
+
+    @contextmanager
+    def lease(self, key: str, loader: Callable[[], Tuple[Any, Dict[str, Any]]], label: str = ""):
+        """Context manager: `(table, meta)` with the dataset pinned until exit."""
+        table, meta = self.get_or_load(key, loader, label=label, pin=True)
+        try:
+            yield table, meta
+        finally:
+            self.release(key)
+
+    # ----- reference counting -----
+    def release(self, key: str) -> None:
+        """Drop one reference taken with `pin=True` (or by `lease()`)."""
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None and e.refs > 0:
+                e.refs -= 1
+            self._evict_to_cap()
+
+    # ----- eviction -----
+    def _evict_to_cap(self, keep: Optional[str] = None) -> None:
+        for key in list(self._entries.keys()):  # oldest first
+            if self.resident_bytes() <= self.cap_bytes:
+                break
+            if key != keep and self._entries[key].refs == 0:
+                del self._entries[key]
+                self.evictions += 1
+
+    def evict(self, key: str) -> bool:
+        """Drop `key` if nobody is using it. Returns True if it was removed."""
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None or e.refs > 0:
+                return False
+            del self._entries[key]
+            self.evictions += 1
+            return True
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            idle = [k for k, e in self._entries.items() if e.refs == 0]
+            for k in idle:
+                del self._entries[k]
+            self.evictions += len(idle)
+            return len(idle)
+
+    # ----- introspection -----
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(e.nbytes for e in self._entries.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One row per resident dataset, most recently used last."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "key": e.key[:12],
+                    "label": e.label,
+                    "rows": e.table.num_rows,
+                    "columns": e.table.num_columns,
+                    "size_mb": round(e.nbytes / 1024 / 1024, 2),
+                    "refs": e.refs,
+                    "hits": e.hits,
+                    "age_s": round(now - e.created, 1),
+                    "idle_s": round(now - e.last_used, 1),
+                }
+                for e in self._entries.values()
+            ]
+
+
+def _as_table(data) -> pa.Table:
+    if isinstance(data, pa.Table):
+        return data
+    # Mixed-type object columns (ids that are sometimes numbers, sometimes text)
+    # make Arrow type inference fail; store those columns as strings.
+    try:
+        return pa.Table.from_pandas(data, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        fixed = data.copy()
+        for c in fixed.columns:
+            if fixed[c].dtype == "object":
+                fixed[c] = fixed[c].map(lambda v: None if v is None or v != v else str(v))
+        return pa.Table.from_pandas(fixed, preserve_index=False)
+
+
+def to_frame(table: pa.Table):
+    """Session view of a shared table as a pandas DataFrame.
+
+    `split_blocks=True` skips block consolidation, so null-free numeric columns
+    point straight at the shared Arrow buffers (read-only) instead of being
+    copied. String/object columns are still materialized per session.
+    """
+    return table.to_pandas(split_blocks=True)
+
+
+def render_admin_panel(registry: DataRegistry, expanded: bool = False) -> None:
+    """Sidebar/expander panel listing what is resident in the shared cache."""
+    import streamlit as st
+
+    with st.expander("Shared data cache (admin)", expanded=expanded):
+        used = registry.resident_bytes()
+        cap = max(1, registry.cap_bytes)
+        st.caption(
+            f"{len(registry)} dataset(s) · {used / 1024 / 1024:,.1f} MB of "
+            f"{cap / 1024 / 1024:,.0f} MB cap · {registry.evictions} eviction(s)"
+        )
+        st.progress(min(1.0, used / cap))
+        rows = registry.snapshot()
+        if rows:
+            st.dataframe(rows, use_container_width=True)
+        else:
+            st.caption("Nothing resident yet.")
+        if st.button("Evict idle datasets", key="registry_evict_idle"):
+            n = registry.evict_idle()
+            st.success(f"Evicted {n} idle dataset(s).")
@@ -0,0 +1,230 @@
+# explorer.py
+# Data layer for the Customers + Transactions Explorer (app3.py): robust file
+# loading, column helpers and the merge/filter/aggregate pipeline. No Streamlit
+# calls in here, so it can be imported by benchmarks and tests.
+
+import io, csv
+import pandas as pd
+import numpy as np
+from pandas.errors import EmptyDataError, ParserError
+
+from tracing import span
+
+# =========================
+# Robust file loader
+# =========================
+def read_table_safely(
+    file,
+    nrows=None,
+    sep_choice="auto",
+    header_choice="first row is header",
+    encoding_choice="utf-8",
+):
+    """Robust reader for CSV/TSV/TXT and XLSX (handles BOM, cp1252, sniffed delimiters)."""
+    if file is None:
+        return None, "No file provided.", {}
+
+    name = getattr(file, "name", "")
+    raw = file.getvalue() if hasattr(file, "getvalue") else None
+    diag = {
+        "name": name,
+        "size_bytes": len(raw) if isinstance(raw, (bytes, bytearray)) else None,
+        "head_bytes": (raw[:2048] if isinstance(raw, (bytes, bytearray)) else None),
+        "sniff_delimiter": None,
+        "sniff_has_header": None,
+    }
+
+    # Excel/ZIP and PDF guards
+    if isinstance(raw, (bytes, bytearray)):
+        if raw[:2] == b"PK":
+            try:
+                return pd.read_excel(io.BytesIO(raw), nrows=nrows), None, diag
+            except Exception as e:
+                return None, f"File looks like Excel (zip) but failed to open: {e}", diag
+        if raw[:4] == b"%PDF":
+            return None, "This is a PDF, not a CSV/TSV.", diag
+
+    # Excel by extension
+    if name.lower().endswith((".xlsx", ".xls")):
+        try:
+            return pd.read_excel(file, nrows=nrows), None, diag
+        except Exception as e:
+            return None, f"Failed to read Excel: {e}", diag
+
+    sep_map = {"auto": None, "comma (,)": ",", "tab (\\t)": "\t", "semicolon (;)": ";", "pipe (|)": "|"}
+    sep = sep_map.get(sep_choice, None)
+    hdr = 0 if header_choice == "first row is header" else None
+
+    # Sniff if auto
+    sniff_sep = None
+    sniff_has_header = None
+    if isinstance(raw, (bytes, bytearray)) and sep is None:
+        with span("sniff", file=name):
+            try:
+                sample = raw[:8192].decode(encoding_choice, errors="ignore")
+                sniffer = csv.Sniffer()
+                sniff_sep = sniffer.sniff(sample).delimiter
+                sniff_has_header = sniffer.has_header(sample)
+                diag["sniff_delimiter"] = sniff_sep
+                diag["sniff_has_header"] = sniff_has_header
+            except Exception:
+                pass
+
+    def _try(enc, s):
+        with span("parse attempt", encoding=enc, sep=repr(s)) as sp:
+            df, err = _read(enc, s)
+            if sp is not None:
+                sp.attrs["ok"] = err is None
+                sp.attrs["rows"] = len(df) if isinstance(df, pd.DataFrame) else 0
+            return df, err
+
+    def _read(enc, s):
+        try:
+            return pd.read_csv(
+                io.BytesIO(raw) if isinstance(raw, (bytes, bytearray)) else file,
+                nrows=nrows,
+                sep=s,
+                engine="python",
+                header=hdr,
+                encoding=enc,
+                on_bad_lines="skip",
+            ), None
+        except EmptyDataError:
+            return None, "The file appears to be empty or has no recognizable columns."
+        except ParserError as e:
+            return None, f"Parser error: {e}"
+        except UnicodeDecodeError as e:
+            return None, f"Encoding error: {e}"
+        except Exception as e:
+            return None, f"Read error: {e}"
+
+    # User choice → sniffed → pandas sniff (None)
+    sep_candidates = [sep] if sep is not None else [sniff_sep, None]
+    enc_candidates = [encoding_choice, "utf-8-sig", "utf-8", "cp1252", "latin-1"]
+
+    for enc in enc_candidates:
+        for s in sep_candidates:
+            df, err = _try(enc, s)
+            if err is None and isinstance(df, pd.DataFrame) and len(df.columns) > 0:
+                return df, None, diag
+
+    # Brute-force fallbacks
+    for enc in ["utf-8-sig", "cp1252", "latin-1"]:
+        for s in [",", "\t", ";", "|"]:
+            df, err = _try(enc, s)
+            if err is None and isinstance(df, pd.DataFrame) and len(df.columns) > 0:
+                return df, None, diag
+
+    return None, "Unable to parse the file. Adjust delimiter/header/encoding.", diag
+
+# =========================
+# Helpers
+# =========================
+def norm(s: str) -> str:
+    s = str(s)
+    return "".join(s.strip().lower().replace("_", "").split())
+
+def suggest_key(cols):
+    candidates = ["customer_id", "customerid", "cust_id", "custid", "cid", "user_id", "userid", "person_id", "personid"]
+    ncols = {norm(c): c for c in cols}
+    for c in candidates:
+        if c in ncols:
+            return ncols[c]
+    for c in cols:
+        if norm(c).endswith("id"):
+            return c
+    return cols[0] if cols else None
+
+def candidate_categoricals(df: pd.DataFrame, extra: list[str] | None = None, max_uniques: int = 50) -> list[str]:
+    cols = []
+    if df is None or df.empty:
+        return cols
+    for c in df.columns:
+        if df[c].dtype == "object":
+            try:
+                nun = df[c].nunique(dropna=True)
+                if 1 < nun <= max_uniques:
+                    cols.append(c)
+            except Exception:
+                pass
+    if extra:
+        for c in extra:
+            if c in df.columns and c not in cols:
+                cols.append(c)
+    return cols
+
+
+# =========================
+# Pipeline (merge → filter → aggregate), UI-free so it can be benchmarked
+# =========================
+def prepare_transactions(tx: pd.DataFrame, tx_date: str, tx_rev: str) -> pd.DataFrame:
+    """Parse the date (into `_tx_dt`) and revenue columns, then drop duplicate rows."""
+    if tx_date in tx.columns:
+        tx["_tx_dt"] = pd.to_datetime(tx[tx_date], errors="coerce")
+    else:
+        tx["_tx_dt"] = pd.NaT
+
+    if tx_rev in tx.columns:
+        tx[tx_rev] = pd.to_numeric(tx[tx_rev], errors="coerce")
+
+    return tx.drop_duplicates()
+
+def merge_customers(tx: pd.DataFrame, cust: pd.DataFrame, tx_key: str, cust_key: str, how: str = "left"):
+    """Join customers onto transactions; returns (merged, merge_stats)."""
+    merged = tx.copy()
+    merged[tx_key] = merged[tx_key].astype("string")
+    cust[cust_key] = cust[cust_key].astype("string")
+    merged = merged.merge(cust, left_on=tx_key, right_on=cust_key, how=how, suffixes=("", "_cust"))
+
+    # Merge status: matched vs unmatched
+    merge_stats = {}
+    merge_stats["transactions"] = len(tx)
+    merge_stats["customers"] = cust[cust_key].nunique()
+    merge_stats["matched_rows"] = merged[tx_key].notna().sum()
+    merge_stats["matched_customers"] = merged[cust_key].notna().sum() if cust_key in merged.columns else np.nan
+    merge_stats["coverage_%"] = round(100 * merge_stats["matched_rows"] / max(1, merge_stats["transactions"]), 2)
+    return merged, merge_stats
+
+def filter_rows(merged: pd.DataFrame, start=None, end=None, field: str = "(None)", value=None) -> pd.DataFrame:
+    """Date range on `_tx_dt` plus an optional `field == value` filter."""
+    mask = pd.Series(True, index=merged.index)
+    if start and end and "_tx_dt" in merged.columns:
+        mask &= merged["_tx_dt"].between(pd.to_datetime(start), pd.to_datetime(end))
+    if field != "(None)" and value and value != "(All)":
+        mask &= merged[field].astype(str).eq(value)
+    return merged.loc[mask].copy()
+
+def compute_kpis(data: pd.DataFrame, tx_rev: str, tx_id: str, tx_key: str) -> dict:
+    total_rev = np.nansum(data[tx_rev]) if tx_rev in data.columns else np.nan
+    tx_count = len(data[tx_id].dropna()) if tx_id in data.columns else len(data)
+    unique_cust = data[tx_key].nunique() if tx_key in data.columns else np.nan
+    aov = (total_rev / tx_count) if tx_count and not np.isnan(total_rev) else np.nan
+    return {"total_rev": total_rev, "tx_count": tx_count, "unique_cust": unique_cust, "aov": aov}
+
+def _resample_rule(freq_code: str) -> str:
+    """Month-end is "M" before pandas 2.2 and "ME" after (pandas 3 rejects "M")."""
+    if freq_code == "M":
+        try:
+            pd.tseries.frequencies.to_offset("ME")
+            return "ME"
+        except ValueError:
+            pass
+    return freq_code
+
+def revenue_over_time(data: pd.DataFrame, tx_rev: str, freq_code: str) -> pd.Series:
+    return (
+        data[["_tx_dt", tx_rev]]
+        .dropna(subset=["_tx_dt", tx_rev])
+        .set_index("_tx_dt")
+        .sort_index()
+        .resample(_resample_rule(freq_code))[tx_rev]
+        .sum()
+    )
+
+def kpi_by_category(data: pd.DataFrame, seg_col: str, tx_rev: str) -> pd.DataFrame:
+    return (
+        data.groupby(seg_col, dropna=False)[tx_rev]
+        .agg(total_revenue="sum", transactions="size", aov=lambda s: s.sum() / len(s))
+        .reset_index()
+        .sort_values("total_revenue", ascending=False)
+    )
@@ -0,0 +1,309 @@
+# streaming_stats.py
+# Bounded-memory summaries of one numeric column, for app2's streaming mode.
+#
+#   s = summarize_csv(io.BytesIO(raw), "order_value")   # reads the column in chunks
+#   s.describe()                                         # like Series.describe()
+#   plot_hist_kde(s, ax)                                 # histogram + KDE from the summary
+#
+# Three mergeable summaries are kept per column, each O(1) or O(compression)
+# in size regardless of row count:
+#   Moments    count/mean/M2/min/max (Welford, merged with Chan et al.'s formula)
+#   TDigest    quantiles; a merging t-digest whose compress step is vectorized
+#              (points are grouped by their bucket on the k1 scale)
+#   Histogram  fixed number of bins on a power-of-two lattice: bins of two
+#              histograms always line up, so merging is adding counts after
+#              coarsening the finer one (neighbouring bins pair up exactly)
+# The KDE is a binned Gaussian KDE over the histogram with Scott's bandwidth,
+# which is what seaborn's histplot(kde=True) draws, without touching the rows.
+
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def _finite(values) -> Tuple[np.ndarray, int]:
+    """(finite float64 values, number dropped as missing/non-numeric/inf)."""
+    x = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.isfinite(x)
+    return x[ok], int(len(x) - ok.sum())
+
+
+# =========================
+# Moments (Welford / Chan)
+# =========================
+class Moments:
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x: np.ndarray) -> "Moments":
+        if len(x):
+            other = Moments()
+            other.n, other.mean = len(x), float(x.mean())
+            other.m2 = float(((x - other.mean) ** 2).sum())
+            other.min, other.max = float(x.min()), float(x.max())
+            self.merge(other)
+        return self
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1, as pandas)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.n > 1 else math.nan
+
+
+# =========================
+# t-digest (merging variant, k1 scale)
+# =========================
+class TDigest:
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray) -> None:
+        m = np.concatenate([self.means, means])
+        w = np.concatenate([self.weights, weights])
+        order = np.argsort(m, kind="mergesort")
+        m, w = m[order], w[order]
+        total = w.sum()
+        q = (np.cumsum(w) - w / 2) / total
+        # k1 scale: k(q) = δ/2π · asin(2q − 1); one centroid per unit of k
+        k = np.floor(self.compression * (np.arcsin(np.clip(2 * q - 1, -1, 1)) / math.pi + 0.5))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(w, starts)
+        self.means = np.add.reduceat(m * w, starts) / self.weights
+
+    def update(self, x: np.ndarray) -> "TDigest":
+        if len(x):
+            self.min, self.max = min(self.min, float(x.min())), max(self.max, float(x.max()))
+            self._absorb(x.astype(np.float64), np.ones(len(x)))
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if len(other.means):
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+        return self
+
+    def quantile(self, q):
+        """Estimated quantile(s) for q in [0, 1]."""
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        cum = np.cumsum(self.weights) - self.weights / 2
+        xp = np.r_[0.0, cum, self.count]
+        fp = np.r_[self.min, self.means, self.max]
+        out = np.interp(np.asarray(q, dtype=np.float64) * self.count, xp, fp)
+        return out if np.ndim(q) else float(out)
+
+
+# =========================
+# Fixed-bin histogram on a power-of-two lattice
+# =========================
+class Histogram:
+    """
+    At most `bins` bins of width 2**exp; bin i covers [(start+i)·w, (start+i+1)·w).
+    When data outside the covered span arrives, neighbouring bins are paired up
+    (width doubles) until everything fits.
+    """
+
+    def __init__(self, bins: int = 128):
+        self.bins = bins
+        self.exp: Optional[int] = None
+        self.start = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def width(self) -> float:
+        return math.ldexp(1.0, self.exp) if self.exp is not None else math.nan
+
+    def edges(self) -> np.ndarray:
+        return (self.start + np.arange(len(self.counts) + 1)) * self.width
+
+    def _coarsen(self) -> None:
+        c = self.counts
+        if self.start % 2:
+            c = np.r_[0, c]
+            self.start -= 1
+        if len(c) % 2:
+            c = np.r_[c, 0]
+        self.counts = c.reshape(-1, 2).sum(axis=1)
+        self.start //= 2
+        self.exp += 1
+
+    def _cover(self, lo_idx: int, hi_idx: int, exp: int) -> None:
+        """Coarsen until bins [lo_idx, hi_idx] (at width 2**exp) and the current span fit in `bins`."""
+        while True:
+            shift = self.exp - exp
+            lo, hi = lo_idx >> shift, hi_idx >> shift
+            first = min(lo, self.start) if len(self.counts) else lo
+            last = max(hi, self.start + len(self.counts) - 1) if len(self.counts) else hi
+            if last - first + 1 <= self.bins:
+                return
+            self._coarsen()
+
+    def _place(self, first: int, last: int) -> None:
+        """Grow counts to cover bin indices [first, last]."""
+        if not len(self.counts):
+            self.start, self.counts = first, np.zeros(last - first + 1, dtype=np.int64)
+            return
+        new_start = min(first, self.start)
+        new_end = max(last, self.start + len(self.counts) - 1)
+        grown = np.zeros(new_end - new_start + 1, dtype=np.int64)
+        grown[self.start - new_start:self.start - new_start + len(self.counts)] = self.counts
+        self.start, self.counts = new_start, grown
+
+    def update(self, x: np.ndarray) -> "Histogram":
+        if not len(x):
+            return self
+        lo_v, hi_v = float(x.min()), float(x.max())
+        if self.exp is None:
+            span = max(hi_v - lo_v, abs(hi_v) * 1e-9, 1e-12)
+            self.exp = math.ceil(math.log2(span / self.bins))
+        while True:
+            exp = self.exp
+            idx = np.floor(np.ldexp(x, -exp)).astype(np.int64)
+            first, last = int(idx.min()), int(idx.max())
+            self._cover(first, last, exp)
+            if self.exp == exp:
+                break  # no coarsening happened; idx is valid at self.exp
+        self._place(first, last)
+        self.counts += np.bincount(idx - self.start, minlength=len(self.counts))[:len(self.counts)]
+        return self
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if other.exp is None:
+            return self
+        other = other.copy()
+        if self.exp is None:
+            self.exp, self.start, self.counts = other.exp, other.start, other.counts
+            return self
+        while other.exp < self.exp:
+            other._coarsen()
+        while self.exp < other.exp:
+            self._coarsen()
+        while True:
+            first, last = other.start, other.start + len(other.counts) - 1
+            exp = self.exp
+            self._cover(first, last, other.exp)
+            while other.exp < self.exp:
+                other._coarsen()
+            if exp == self.exp:
+                break
+        self._place(other.start, other.start + len(other.counts) - 1)
+        off = other.start - self.start
+        self.counts[off:off + len(other.counts)] += other.counts
+        return self
+
+    def copy(self) -> "Histogram":
+        h = Histogram(self.bins)
+        h.exp, h.start, h.counts = self.exp, self.start, self.counts.copy()
+        return h
+
+
+# =========================
+# Column summary
+# =========================
+class StreamingSummary:
+    """Moments + t-digest + histogram for one column; feed it chunks, merge partial summaries."""
+
+    def __init__(self, bins: int = 128, compression: float = 200.0):
+        self.moments = Moments()
+        self.digest = TDigest(compression)
+        self.hist = Histogram(bins)
+        self.missing = 0
+
+    def update(self, values) -> "StreamingSummary":
+        x, dropped = _finite(values)
+        self.missing += dropped
+        self.moments.update(x)
+        self.digest.update(x)
+        self.hist.update(x)
+        return self
+
+    def merge(self, other: "StreamingSummary") -> "StreamingSummary":
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.hist.merge(other.hist)
+        self.missing += other.missing
+        return self
+
+    def describe(self) -> pd.Series:
+        """Same index as pandas' Series.describe() for a numeric column."""
+        m = self.moments
+        q25, q50, q75 = self.digest.quantile([0.25, 0.5, 0.75]) if m.n else (math.nan,) * 3
+        return pd.Series({"count": float(m.n), "mean": m.mean if m.n else math.nan, "std": m.std,
+                          "min": m.min if m.n else math.nan, "25%": q25, "50%": q50, "75%": q75,
+                          "max": m.max if m.n else math.nan})
+
+    def kde(self, points: int = 512, bw_adjust: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Binned Gaussian KDE (Scott's bandwidth from the moments): (x, density)."""
+        m, h = self.moments, self.hist
+        if m.n < 2 or not len(h.counts) or not m.std > 0:
+            return np.empty(0), np.empty(0)
+        bw = bw_adjust * m.std * m.n ** (-1 / 5)
+        bw = max(bw, h.width / 2)  # never narrower than the binning
+        edges = h.edges()
+        centers = (edges[:-1] + edges[1:]) / 2
+        keep = h.counts > 0
+        c, w = centers[keep], h.counts[keep].astype(np.float64)
+        x = np.linspace(max(m.min - 3 * bw, edges[0] - 3 * bw), min(m.max + 3 * bw, edges[-1] + 3 * bw), points)
+        z = (x[:, None] - c[None, :]) / bw
+        density = (np.exp(-0.5 * z * z) @ w) / (m.n * bw * math.sqrt(2 * math.pi))
+        return x, density
+
+
+def summarize_chunks(chunks: Iterable, **kwargs) -> StreamingSummary:
+    s = StreamingSummary(**kwargs)
+    for chunk in chunks:
+        s.update(chunk)
+    return s
+
+
+def summarize_csv(source, column: str, chunksize: int = DEFAULT_CHUNK_ROWS, **read_csv_kwargs) -> StreamingSummary:
+    """Read only `column` from a CSV path/buffer, `chunksize` rows at a time."""
+    reader = pd.read_csv(source, usecols=[column], chunksize=chunksize, **read_csv_kwargs)
+    return summarize_chunks(chunk[column] for chunk in reader)
+
+
+def plot_hist_kde(s: StreamingSummary, ax, max_bars: int = 60, kde: bool = True) -> None:
+    """Histogram (re-binned to at most `max_bars`) + KDE scaled to counts, like sns.histplot(kde=True)."""
+    h = s.hist.copy()
+    while len(h.counts) > max_bars:
+        h._coarsen()
+    if not len(h.counts):
+        return
+    edges = h.edges()
+    ax.stairs(h.counts, edges, fill=True, alpha=0.5, edgecolor="white")
+    if kde:
+        x, d = s.kde()
+        if len(x):
+            ax.plot(x, d * s.moments.n * h.width)
+    ax.set_ylabel("Count")
@@ -0,0 +1,214 @@
+# tracing.py
+# Lightweight span timers + per-rerun profile panel for the Streamlit apps.
+#
+#   trace = begin_rerun("app3")            # top of the script
+#   with span("merge", rows=len(tx)):      # anywhere (also inside library code)
+#       ...
+#   end_rerun(trace)                       # bottom: profile panel, JSONL export, flame data
+#
+# Spans are recorded on a thread-local trace (Streamlit runs each session's
+# script in its own thread). With no active trace, span() is a no-op, so
+# library code can stay instrumented when used from tests or benchmarks.
+#
+# The style quiz (ai-shopper/) uses this module when it is importable
+# (tjx_style_demo/spans.py), and no-op spans otherwise.
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+TRACE_DIR = os.getenv("TJX_TRACE_DIR", "traces")
+
+_local = threading.local()
+
+
+@dataclass
+class Span:
+    name: str
+    start: float                 # seconds since trace start
+    depth: int
+    duration: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    def __init__(self, app: str):
+        self.app = app
+        self.id = uuid.uuid4().hex[:12]
+        self.t0 = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans: List[Span] = []
+        self._depth = 0
+        self.profiler: Optional["SamplingProfiler"] = None
+
+    def total(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "span": "  " * s.depth + s.name,
+                "start_ms": round(s.start * 1000, 1),
+                "ms": round((s.duration or 0) * 1000, 1),
+                **{k: v for k, v in s.attrs.items()},
+            }
+            for s in self.spans
+        ]
+
+
+def start_trace(app: str) -> Trace:
+    t = Trace(app)
+    _local.trace = t
+    return t
+
+
+def current_trace() -> Optional[Trace]:
+    return getattr(_local, "trace", None)
+
+
+def stop_trace() -> Optional[Trace]:
+    t = current_trace()
+    _local.trace = None
+    return t
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as a child of the current span (no-op without a trace)."""
+    t = current_trace()
+    if t is None:
+        yield None
+        return
+    s = Span(name=name, start=time.perf_counter() - t.t0, depth=t._depth, attrs=dict(attrs))
+    t.spans.append(s)
+    t._depth += 1
+    try:
+        yield s
+    except Exception as e:
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        t._depth -= 1
+        s.duration = time.perf_counter() - t.t0 - s.start
+
+
+def export_jsonl(trace: Trace, path: str) -> str:
+    """Append one JSON line per span to `path`."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for s in trace.spans:
+            rec = {"trace_id": trace.id, "app": trace.app, "ts": trace.wall_start + s.start, **asdict(s)}
+            f.write(json.dumps(rec, default=str) + "\n")
+    return path
+
+
+# =========================
+# Sampling profiler (flame data)
+# =========================
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds and counts
+    collapsed stacks ("outer;inner;leaf" -> samples), the input format of
+    flamegraph.pl / speedscope. Stops itself after `max_seconds`.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005, max_seconds: float = 120.0):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="tjx-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        return self.stacks
+
+    def _run(self):
+        deadline = time.perf_counter() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{k} {v}" for k, v in self.stacks.most_common())
+
+
+# =========================
+# Streamlit glue
+# =========================
+def begin_rerun(app: str) -> Trace:
+    """Start a trace for this script run (and the sampler if it is switched on)."""
+    import streamlit as st
+
+    stale = st.session_state.pop("_trace_profiler", None)
+    if stale is not None:  # previous run ended early (st.stop / exception)
+        stale.stop()
+    t = start_trace(app)
+    if st.session_state.get("trace_profile_on"):
+        t.profiler = SamplingProfiler().start()
+        st.session_state["_trace_profiler"] = t.profiler
+    return t
+
+
+def end_rerun(trace: Trace, expanded: bool = False) -> None:
+    """Collapsible profile panel for this rerun, plus optional JSONL export / flame data."""
+    import streamlit as st
+
+    total = trace.total()
+    stop_trace()
+    stacks = None
+    if trace.profiler is not None:
+        stacks = trace.profiler.stop()
+        st.session_state.pop("_trace_profiler", None)
+
+    with st.expander(f"⏱ Profile: {total * 1000:,.0f} ms this rerun ({len(trace.spans)} spans)", expanded=expanded):
+        if trace.spans:
+            st.dataframe(trace.rows(), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No instrumented stages ran.")
+
+        c1, c2, c3 = st.columns(3)
+        export = c1.toggle("Export spans to JSONL", key="trace_export_on")
+        c2.toggle("Sampling profiler", key="trace_profile_on",
+                  help="Samples the script thread's stack on the next reruns; flame data is kept for slow ones.")
+        slow_ms = c3.number_input("Slow rerun (ms)", min_value=0, value=1000, step=100, key="trace_slow_ms")
+
+        if export and trace.spans:
+            path = export_jsonl(trace, os.path.join(TRACE_DIR, f"{trace.app}.jsonl"))
+            st.caption(f"Spans appended to `{path}`")
+
+        if stacks is not None:
+            if total * 1000 >= slow_ms and stacks:
+                collapsed = trace.profiler.collapsed()
+                path = os.path.join(TRACE_DIR, f"{trace.app}-{trace.id}.collapsed")
+                os.makedirs(TRACE_DIR, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(collapsed)
+                st.caption(f"Slow rerun: {sum(stacks.values())} samples saved to `{path}` "
+                           "(open with speedscope or flamegraph.pl)")
+                st.download_button("Download flame data", collapsed.encode("utf-8"),
+                                   file_name=os.path.basename(path), mime="text/plain")
+            else:
+                st.caption(f"Profiler on: rerun under {slow_ms} ms, flame data discarded.")
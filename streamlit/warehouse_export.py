@@ -0,0 +1,431 @@
+# warehouse_export.py
+# Bulk write-back of a DataFrame to a warehouse table: compressed Parquet
+# chunks, staged in parallel and bulk-loaded (no row-by-row INSERTs).
+#
+#   loader = SnowflakeLoader(lambda: snowflake_connect(cfg))    # or SQLiteLoader("exports/local.db")
+#   summary = export_frame(df, "EXPLORER_RESULTS", loader, progress=print)
+#
+# Each export works in exports/<table>-<fingerprint>/ (TJX_EXPORT_DIR), where
+# the fingerprint hashes the frame's contents. A manifest.json there records
+# every chunk's state (written → staged → loaded), so re-running the same export
+# after a failure skips chunks that already made it and only redoes the rest.
+# The manifest only describes an unfinished run: it is removed once the export
+# completes (and ignored if marked complete), so exporting the same frame again
+# goes back to the warehouse, whose loaders are idempotent per chunk file
+# (Snowflake's COPY load history, a _loaded_files table for SQLite). Both are
+# tied to the target table's lifetime: Snowflake keeps load history per table,
+# and SQLiteLoader.prepare() clears the table's _loaded_files rows whenever it
+# has to create the table. Re-running into an unchanged table loads nothing;
+# into a dropped, re-created or reset one, everything.
+#
+# Only render_export_panel() touches Streamlit (imported lazily), so the rest
+# can be used from scripts and tests.
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from tracing import span
+
+EXPORT_DIR = os.getenv("TJX_EXPORT_DIR", "exports")
+DEFAULT_CHUNK_ROWS = 250_000
+DEFAULT_COMPRESSION = "zstd"
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*){0,2}$")
+
+
+def check_table_name(table: str) -> str:
+    """Table names are interpolated into SQL, so only plain (optionally db.schema.) identifiers are allowed."""
+    if not _IDENT.match(table or ""):
+        raise ValueError(f"Invalid table name: {table!r} (use letters, digits and _; optionally DB.SCHEMA.TABLE)")
+    return table
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of the frame (values + column names/dtypes); same data → same export directory."""
+    h = hashlib.sha1()
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# =========================
+# Loader interface
+# =========================
+class WarehouseLoader:
+    """
+    What export_frame() needs from a warehouse. stage() is called from several
+    threads at once; prepare(), load() and finish() from the calling thread.
+    load() gets up to `load_batch` files per call.
+    """
+
+    name = "warehouse"
+    load_batch = 8
+
+    def prepare(self, table: str, sample: pd.DataFrame) -> None:
+        """Create `table` (columns/types from `sample`) if it does not exist."""
+        raise NotImplementedError
+
+    def stage(self, path: str, run_id: str) -> None:
+        """Upload one local Parquet chunk so load() can see it."""
+        raise NotImplementedError
+
+    def load(self, table: str, run_id: str, files: Sequence[str]) -> Optional[int]:
+        """
+        Bulk-load staged chunk files (basenames) into `table`; loading a file
+        twice must be a no-op. Returns the rows actually inserted (None if unknown).
+        """
+        raise NotImplementedError
+
+    def finish(self, table: str, run_id: str) -> None:
+        """Clean up staged files after a complete export."""
+
+    def close(self) -> None:
+        pass
+
+
+_SF_TYPES = {"i": "NUMBER(38,0)", "u": "NUMBER(38,0)", "f": "FLOAT", "b": "BOOLEAN", "M": "TIMESTAMP_NTZ"}
+
+
+def snowflake_connect(cfg: Dict[str, str]):
+    """snowflake.connector connection from an app4-style config dict (imported on first use)."""
+    import snowflake.connector as sf
+    return sf.connect(
+        account=cfg["account"], user=cfg["user"], password=cfg["password"], role=cfg.get("role"),
+        warehouse=cfg["warehouse"], database=cfg["database"], schema=cfg["schema"],
+        client_session_keep_alive=True,
+    )
+
+
+class SnowflakeLoader(WarehouseLoader):
+    """
+    PUT each chunk to a named internal stage (one connection per uploading
+    thread), then COPY INTO the table in batches of files; the warehouse loads
+    the files of a COPY in parallel and its load history skips files that
+    were already loaded.
+    """
+
+    name = "snowflake"
+    load_batch = 100  # files per COPY statement (Snowflake allows up to 1000)
+
+    def __init__(self, connect: Callable[[], Any], stage: str = "TJX_EXPORT_STAGE", put_parallel: int = 4):
+        self._connect = connect
+        self.stage_name = check_table_name(stage)
+        self.put_parallel = put_parallel
+        self._local = threading.local()
+        self._cons: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _con(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = self._connect()
+            with self._lock:
+                self._cons.append(con)
+        return con
+
+    def _exec(self, sql: str):
+        cur = self._con().cursor()
+        try:
+            cur.execute(sql)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def prepare(self, table, sample):
+        cols = ", ".join(f'"{c}" {_SF_TYPES.get(t.kind, "VARCHAR")}' for c, t in sample.dtypes.items())
+        self._exec(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        self._exec(f"CREATE STAGE IF NOT EXISTS {self.stage_name} FILE_FORMAT = (TYPE = PARQUET)")
+
+    def stage(self, path, run_id):
+        uri = "file://" + os.path.abspath(path).replace("\\", "/")
+        self._exec(f"PUT '{uri}' @{self.stage_name}/{run_id}/ "
+                   f"AUTO_COMPRESS = FALSE OVERWRITE = TRUE PARALLEL = {self.put_parallel}")
+
+    def load(self, table, run_id, files):
+        names = ", ".join(f"'{f}'" for f in files)
+        result = self._exec(f"COPY INTO {table} FROM @{self.stage_name}/{run_id}/ FILES = ({names}) "
+                            "FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE")
+        # One row per file (file, status, rows_parsed, rows_loaded, ...); a single
+        # "0 files processed" row when the load history skipped them all.
+        return sum(int(r[3] or 0) for r in result if len(r) > 3)
+
+    def finish(self, table, run_id):
+        self._exec(f"REMOVE @{self.stage_name}/{run_id}/")
+
+    def close(self):
+        with self._lock:
+            cons, self._cons = self._cons, []
+        for con in cons:
+            try:
+                con.close()
+            except Exception:
+                pass
+
+
+class SQLiteLoader(WarehouseLoader):
+    """
+    Local stand-in with the same contract: stage() copies the chunk into a
+    stage directory next to the database, load() appends each staged file in
+    one transaction together with a _loaded_files row (so reloading is a no-op).
+    The records belong to the table: prepare() forgets them when the table has
+    to be (re)created, e.g. after a DROP TABLE.
+    """
+
+    name = "sqlite"
+    load_batch = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stage_dir = os.path.splitext(path)[0] + "_stage"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def prepare(self, table, sample):
+        con = self._connect()
+        try:
+            with con:
+                exists = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+                                     (table,)).fetchone()
+                sample.head(0).to_sql(table, con, if_exists="append", index=False)
+                con.execute("CREATE TABLE IF NOT EXISTS _loaded_files (tbl TEXT, run_id TEXT, file TEXT, "
+                            "rows INTEGER, PRIMARY KEY (tbl, run_id, file))")
+                if not exists:  # new table: records of loads into a dropped one no longer hold
+                    con.execute("DELETE FROM _loaded_files WHERE tbl = ?", (table,))
+        finally:
+            con.close()
+
+    def stage(self, path, run_id):
+        dest = os.path.join(self.stage_dir, run_id)
+        os.makedirs(dest, exist_ok=True)
+        shutil.copyfile(path, os.path.join(dest, os.path.basename(path)))
+
+    def load(self, table, run_id, files):
+        con = self._connect()
+        inserted = 0
+        try:
+            for f in files:
+                if con.execute("SELECT 1 FROM _loaded_files WHERE tbl = ? AND run_id = ? AND file = ?",
+                               (table, run_id, f)).fetchone():
+                    continue
+                chunk = pd.read_parquet(os.path.join(self.stage_dir, run_id, f))
+                with con:  # one transaction: rows + load record
+                    chunk.to_sql(table, con, if_exists="append", index=False, chunksize=50_000)
+                    con.execute("INSERT INTO _loaded_files VALUES (?, ?, ?, ?)", (table, run_id, f, len(chunk)))
+                inserted += len(chunk)
+        finally:
+            con.close()
+        return inserted
+
+    def finish(self, table, run_id):
+        shutil.rmtree(os.path.join(self.stage_dir, run_id), ignore_errors=True)
+
+
+# =========================
+# Export
+# =========================
+def _write_parquet(part: pd.DataFrame, path: str, compression: str) -> None:
+    opts = dict(index=False, compression=compression, coerce_timestamps="us", allow_truncated_timestamps=True)
+    try:
+        part.to_parquet(path, **opts)
+    except Exception:
+        # Mixed-type object columns (ids that are sometimes numbers, sometimes
+        # text) cannot be typed by Arrow; write those columns as strings.
+        fixed = part.copy()
+        for c in fixed.columns:
+            if fixed[c].dtype == "object":
+                fixed[c] = fixed[c].map(lambda v: None if v is None or v != v else str(v))
+        fixed.to_parquet(path, **opts)
+
+
+def _load_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(path: str, manifest: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def export_frame(
+    df: pd.DataFrame,
+    table: str,
+    loader: WarehouseLoader,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: int = 4,
+    compression: str = DEFAULT_COMPRESSION,
+    export_dir: str = EXPORT_DIR,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    keep_files: bool = False,
+) -> Dict[str, Any]:
+    """
+    Write `df` to `table` as Parquet chunks of `chunk_rows`: chunks are written
+    and staged by `workers` threads, then bulk-loaded. Re-running after a
+    failure resumes from the manifest; once an export completes its manifest is
+    gone, and whether chunks are loaded again is up to the loader's own
+    de-duplication. Returns a summary with throughput.
+    `progress` is always called from the calling thread (safe for Streamlit).
+    """
+    check_table_name(table)
+    t0 = time.perf_counter()
+    fingerprint = frame_fingerprint(df)
+    run_id = f"{re.sub(r'[^A-Za-z0-9_]', '_', table)}-{fingerprint[:12]}"
+    work = os.path.join(export_dir, run_id)
+    os.makedirs(work, exist_ok=True)
+    manifest_path = os.path.join(work, "manifest.json")
+
+    n_chunks = max(1, -(-len(df) // chunk_rows))
+    manifest = _load_manifest(manifest_path)
+    if not manifest or manifest.get("completed") or manifest.get("fingerprint") != fingerprint or manifest.get("chunk_rows") != chunk_rows \
+            or manifest.get("loader") != loader.name or manifest.get("table") != table:
+        manifest = {"table": table, "loader": loader.name, "fingerprint": fingerprint, "rows": len(df),
+                    "chunk_rows": chunk_rows, "compression": compression, "chunks": {}}
+    chunks = manifest["chunks"]
+    lock = threading.Lock()
+    stats = {"rows": 0, "bytes": 0, "done": 0, "inserted": 0}
+    resumed = sum(1 for c in chunks.values() if c.get("state") == "loaded")
+
+    def report(phase, **extra):
+        if progress is None:
+            return
+        elapsed = time.perf_counter() - t0
+        progress({"phase": phase, "chunks": n_chunks, "done": stats["done"], "resumed": resumed,
+                  "rows": stats["rows"], "bytes": stats["bytes"], "elapsed_s": elapsed,
+                  "rows_per_s": stats["rows"] / elapsed if elapsed > 0 else 0.0, **extra})
+
+    def set_state(name, **fields):
+        with lock:
+            chunks.setdefault(name, {}).update(fields)
+            _save_manifest(manifest_path, manifest)
+
+    def write_and_stage(i):
+        name = f"part-{i:05d}.parquet"
+        path = os.path.join(work, name)
+        state = chunks.get(name, {}).get("state")
+        part = df.iloc[i * chunk_rows:(i + 1) * chunk_rows]
+        if state is None or (state == "written" and not os.path.exists(path)):
+            _write_parquet(part, path, compression)
+            set_state(name, state="written", rows=len(part), bytes=os.path.getsize(path))
+            state = "written"
+        if state == "written":
+            loader.stage(path, run_id)
+            set_state(name, state="staged")
+        return name
+
+    loader.prepare(table, df.head(1000))
+    todo = [i for i in range(n_chunks) if chunks.get(f"part-{i:05d}.parquet", {}).get("state") != "loaded"]
+    stats["done"] = n_chunks - len(todo)
+    report("start")
+
+    staged = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for fut in as_completed([pool.submit(write_and_stage, i) for i in todo]):
+            name = fut.result()
+            staged.append(name)
+            stats["rows"] += chunks[name]["rows"]
+            stats["bytes"] += chunks[name]["bytes"]
+            stats["done"] += 1
+            report("staging", chunk=name)
+
+    staged.sort()
+    stats.update(rows=0, bytes=0, done=n_chunks - len(todo))
+    step = max(1, loader.load_batch)
+    for lo in range(0, len(staged), step):
+        batch = staged[lo:lo + step]
+        inserted = loader.load(table, run_id, batch)
+        stats["inserted"] += sum(chunks[n]["rows"] for n in batch) if inserted is None else inserted
+        for name in batch:
+            set_state(name, state="loaded")
+            stats["rows"] += chunks[name]["rows"]
+            stats["bytes"] += chunks[name]["bytes"]
+            stats["done"] += 1
+        report("loading")
+
+    loader.finish(table, run_id)
+
+    elapsed = time.perf_counter() - t0
+    loaded_rows = stats["inserted"]
+    summary = {
+        "table": table, "loader": loader.name, "run_id": run_id, "rows": len(df), "chunks": n_chunks,
+        "loaded_chunks": len(todo), "skipped_chunks": n_chunks - len(todo), "loaded_rows": loaded_rows,
+        "parquet_bytes": sum(c.get("bytes", 0) for c in chunks.values()), "seconds": round(elapsed, 3),
+        "rows_per_s": round(loaded_rows / elapsed, 1) if elapsed > 0 else None,
+    }
+    if keep_files:
+        manifest["completed"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        _save_manifest(manifest_path, manifest)
+    else:
+        shutil.rmtree(work, ignore_errors=True)
+    report("done", summary=summary)
+    return summary
+
+
+# =========================
+# Streamlit panel (shared by app3 / app4)
+# =========================
+def render_export_panel(df: pd.DataFrame, targets: Dict[str, Callable[[], WarehouseLoader]],
+                        key: str = "export", default_table: str = "EXPLORER_RESULTS") -> Optional[Dict[str, Any]]:
+    """Table name / target / chunk size inputs, an Export button, and a live progress bar."""
+    import streamlit as st
+
+    if not targets:
+        st.info("No warehouse target is configured.")
+        return None
+    c1, c2, c3 = st.columns([2, 1, 1])
+    table = c1.text_input("Target table", value=default_table, key=f"{key}_table")
+    target = c2.selectbox("Warehouse", list(targets), key=f"{key}_target")
+    chunk_rows = c3.number_input("Rows per chunk", min_value=1_000, value=DEFAULT_CHUNK_ROWS, step=50_000,
+                                 key=f"{key}_chunk_rows")
+    if not st.button(f"Export {len(df):,} rows", key=f"{key}_go", type="primary"):
+        st.caption("Chunks are written as Parquet, staged in parallel and bulk-loaded. "
+                   "If an export is interrupted, run it again: loaded chunks are skipped.")
+        return None
+
+    bar = st.progress(0.0, text="Preparing…")
+
+    def progress(ev):
+        n = max(1, ev["chunks"])
+        frac = ev["done"] / n
+        if ev["phase"] == "staging":
+            bar.progress(0.5 * frac, text=f"Staged {ev['done']}/{n} chunks · {ev['bytes'] / 1e6:,.1f} MB Parquet")
+        elif ev["phase"] == "loading":
+            bar.progress(0.5 + 0.5 * frac, text=f"Loaded {ev['done']}/{n} chunks · {ev['rows_per_s']:,.0f} rows/s")
+
+    try:
+        table = check_table_name(table.strip())
+        loader = targets[target]()
+    except Exception as e:
+        st.error(str(e))
+        return None
+    try:
+        with span("warehouse export", target=target, rows=len(df)):
+            summary = export_frame(df, table, loader, chunk_rows=int(chunk_rows), progress=progress)
+    except Exception as e:
+        st.error(f"Export failed: {type(e).__name__}: {e}. Run it again to resume from the last loaded chunk.")
+        return None
+    finally:
+        loader.close()
+
+    bar.progress(1.0, text="Done")
+    present = summary["rows"] - summary["loaded_rows"]
+    skipped = f" ({present:,} rows were already loaded)" if present > 0 else ""
+    st.success(f"Exported {summary['loaded_rows']:,} rows to `{table}` on {target} in {summary['seconds']:.1f}s "
+               f"· {summary['rows_per_s'] or 0:,.0f} rows/s · {summary['chunks']} chunks{skipped}")
+    return summary
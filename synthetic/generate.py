@@ -0,0 +1,541 @@
+# generate.py
+# Deterministic synthetic StyleForward data at load-test scale (1M–100M rows).
+#
+# Produces the same tables and columns as data/*.csv, with referentially
+# consistent ids (every transaction's customer/store exists, every line item's
+# product/transaction exists, transaction subtotals equal the sum of their
+# line totals, converted touchpoints point at real transactions).
+#
+#   python synthetic/generate.py --transactions 10_000_000 --out synthetic_out --format parquet
+#
+# Output: <out>/<table>/part-00000.<fmt> … plus <out>/manifest.json.
+# Big tables are generated shard by shard across a process pool; each shard
+# has its own seed derived from (--seed, table, shard), so the output is
+# identical for any --workers value. Dates are written as ISO timestamps.
+# Arrays every transaction shard needs (product prices, customer purchase
+# weights) are computed once and shared with the workers as memory-mapped .npy
+# files.
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Schemas (column order matches data/*.csv)
+# =========================
+SCHEMAS = {
+    "customers": ["customer_id", "first_name", "last_name", "email", "city", "state", "age", "gender",
+                  "customer_segment", "acquisition_date", "acquisition_channel", "lifetime_value", "churn_risk"],
+    "products": ["product_id", "product_sku", "product_name", "category", "subcategory", "brand", "cost",
+                 "retail_price", "seasonal_flag", "launch_date"],
+    "stores": ["store_id", "store_name", "store_type", "city", "state", "square_footage", "manager_name",
+               "opened_date", "zone"],
+    "transactions": ["transaction_id", "customer_id", "order_date", "channel", "store_id", "payment_method",
+                     "card_bank", "subtotal", "discount_amount", "tax_amount", "shipping_amount", "total_amount",
+                     "promo_code_used", "device_type", "fulfillment_method", "return_flag"],
+    "transaction_items": ["item_id", "transaction_id", "product_id", "quantity", "unit_price",
+                          "discount_percent", "line_total"],
+    "customer_touchpoints": ["touchpoint_id", "customer_id", "session_id", "touchpoint_timestamp",
+                             "touchpoint_type", "channel", "campaign_id", "referrer_source", "landing_page",
+                             "pages_viewed", "products_viewed", "cart_additions", "cart_value",
+                             "converted_flag", "transaction_id", "device_type", "store_id"],
+    "inventory_snapshots": ["snapshot_id", "snapshot_date", "product_id", "store_id", "location_type",
+                            "quantity_on_hand", "quantity_available", "quantity_reserved", "stockout_flag",
+                            "days_of_supply"],
+    "marketing_campaigns": ["campaign_id", "campaign_name", "campaign_type", "channel", "start_date",
+                            "end_date", "budget", "target_audience", "campaign_goal", "status"],
+    "marketing_spend": ["spend_id", "campaign_id", "spend_date", "channel", "impressions", "clicks",
+                        "spend_amount", "conversions", "revenue_attributed"],
+}
+TABLE_NO = {name: i for i, name in enumerate(SCHEMAS)}
+
+# First id of each entity (same ranges as the sample files)
+ID_BASE = {"customers": 1001, "products": 2001, "stores": 3001, "transactions": 4001,
+           "transaction_items": 5001, "customer_touchpoints": 6001, "marketing_spend": 7001,
+           "inventory_snapshots": 8001, "marketing_campaigns": 101}
+
+# =========================
+# Value pools & weights (estimated from data/*.csv)
+# =========================
+FIRST_NAMES = np.array(["Emily", "Michael", "Sarah", "James", "Jessica", "David", "Ashley", "Chris", "Amanda",
+                        "Daniel", "Olivia", "Matthew", "Sophia", "Andrew", "Isabella", "Joshua", "Mia", "Ryan",
+                        "Ava", "Kevin", "Emma", "Brian", "Madison", "Jason", "Chloe", "Tyler", "Grace", "Eric"])
+LAST_NAMES = np.array(["Johnson", "Chen", "Williams", "Davis", "Martinez", "Brown", "Garcia", "Miller", "Wilson",
+                       "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Lee", "Harris", "Clark", "Lewis",
+                       "Robinson", "Walker", "Young", "Allen", "King", "Wright", "Lopez", "Hill", "Scott", "Nguyen"])
+CITIES = np.array(["Austin", "Dallas", "Houston", "San Antonio", "Fort Worth", "El Paso", "Plano", "Arlington"])
+CITY_P = np.array([9, 5, 7, 4, 3, 3, 1, 1], dtype=float)
+SEGMENTS = np.array(["Occasional", "High-Value", "Frequent", "New", "Dormant"])
+SEGMENT_P = np.array([7, 8, 8, 4, 4], dtype=float)
+# Lifetime value (lognormal median) and purchase frequency weight per segment
+SEGMENT_LTV = np.array([700.0, 4500.0, 2200.0, 200.0, 250.0])
+SEGMENT_FREQ = np.array([1.0, 3.0, 2.5, 0.6, 0.3])
+ACQ_CHANNELS = np.array(["Social Media", "Google", "Email", "Direct", "Instagram", "Referral", "Facebook", "TikTok"])
+ACQ_P = np.array([3, 6, 7, 4, 3, 3, 3, 2], dtype=float)
+CHURN = np.array(["Low", "Medium", "High"])
+CHURN_P = np.array([15, 9, 7], dtype=float)
+
+CATEGORIES = {
+    "Apparel": (["Tops", "Bottoms", "Dresses", "Outerwear"], ["Tee", "Jeans", "Dress", "Jacket", "Sweater", "Chinos"]),
+    "Footwear": (["Athletic", "Casual"], ["Sneakers", "Boots", "Loafers", "Sandals"]),
+    "Accessories": (["Bags", "Eyewear", "Scarves", "Belts", "Watches"], ["Tote", "Sunglasses", "Scarf", "Belt", "Watch"]),
+    "Electronics": (["Wearables"], ["Fitness Tracker", "Smartwatch", "Earbuds"]),
+}
+CATEGORY_P = np.array([12, 3, 13, 2], dtype=float)
+ADJECTIVES = np.array(["Classic", "Slim Fit", "Summer", "Running", "Leather", "Cotton", "Wool", "Vintage", "Urban",
+                       "Cozy", "Linen", "Silk", "Canvas", "Cable Knit", "Floral", "Retro", "Active", "Everyday"])
+BRANDS = np.array(["StyleForward", "Urban Denim", "Bloom", "SpeedRun", "Carry Co", "SunShade", "Pulse", "Northwind",
+                   "Atelier 9", "Basics+"])
+PRICE_POINTS = np.array([19.99, 24.99, 29.99, 34.99, 39.99, 49.99, 59.99, 69.99, 79.99, 89.99, 99.99, 119.99,
+                         129.99, 149.99, 199.99, 249.99])
+
+STORE_TYPES = np.array(["Flagship", "Standard", "Outlet", "Pop-up"])
+STORE_TYPE_P = np.array([3, 7, 3, 2], dtype=float)
+STORE_SQFT = np.array([25000, 15000, 18000, 3000])
+ZONES = np.array(["Central", "North", "South", "West"])
+ZONE_P = np.array([3, 6, 5, 1], dtype=float)
+
+TX_CHANNELS = np.array(["Online", "Store", "Mobile App"])
+TX_CHANNEL_P = np.array([20, 16, 9], dtype=float)
+# Includes the messy spellings present in the real extract
+PAYMENTS = np.array(["Credit Card", "Credit Cards", "credit card", "CC", "PayPal", "Apple Pay", "Google Pay",
+                     "Debit Card", "Cash"])
+PAYMENT_P = np.array([24, 2, 1, 1, 4, 4, 2, 4, 3], dtype=float)
+BANKS = np.array(["", "Chase", "Citi", "Bank of America", "Wells Fargo"])
+BANK_P = np.array([41, 3, 1, 1, 1], dtype=float)
+PROMOS = np.array(["", "SPRING24", "WELCOME10", "VIP20", "TIKTOK20", "SUMMER15"])
+PROMO_P = np.array([60, 10, 10, 8, 6, 6], dtype=float)
+DEVICES = np.array(["Mobile", "Desktop"])
+ITEMS_PER_TX = np.array([1, 2, 3, 4])
+ITEMS_PER_TX_P = np.array([60, 25, 10, 5], dtype=float)
+DISCOUNTS = np.array([0, 10, 15, 20, 25, 30, 50])
+DISCOUNT_P = np.array([12, 2, 4, 4, 3, 1, 1], dtype=float)
+
+TP_TYPES = np.array(["Ad Click", "Web Visit", "Email Open", "Store Visit", "Ad View"])
+TP_TYPE_P = np.array([4, 14, 3, 5, 1], dtype=float)
+TP_CHANNEL = {"Ad Click": (["Instagram", "TikTok", "Facebook", "Google"], ["instagram.com", "tiktok.com", "facebook.com", "google.com"]),
+              "Ad View": (["Instagram", "TikTok", "Facebook"], ["instagram.com", "tiktok.com", "facebook.com"]),
+              "Web Visit": (["Direct", "Google"], ["direct", "google.com"]),
+              "Email Open": (["Email"], ["gmail.com"]),
+              "Store Visit": (["Walk-in"], [""])}
+LANDING = np.array(["/home", "/sale", "/spring-collection", "/new-arrivals", "/activewear", "/accessories"])
+
+CAMPAIGN_TYPES = np.array(["Promotional", "Sales", "Retention", "Influencer", "Performance", "Event", "Product Launch"])
+CAMPAIGN_TYPE_P = np.array([6, 9, 3, 3, 3, 3, 3], dtype=float)
+CAMPAIGN_CHANNELS = np.array(["Instagram", "Google", "Email", "Facebook", "TikTok", "Direct Mail", "Push Notification"])
+CAMPAIGN_CHANNEL_P = np.array([6, 6, 6, 3, 3, 3, 3], dtype=float)
+AUDIENCES = np.array(["18-35 Female", "All Segments", "Existing Customers", "25-45 Active", "Lapsed Customers"])
+GOALS = np.array(["Brand Awareness", "Revenue", "Engagement", "Acquisition", "Conversion", "Traffic", "Reactivation"])
+GOAL_P = np.array([6, 6, 6, 3, 3, 3, 3], dtype=float)
+STATUS = np.array(["Completed", "Active", "Planned"])
+STATUS_P = np.array([4, 13, 13], dtype=float)
+
+START = np.datetime64("2024-01-01T00:00")
+DAYS = 365
+
+
+def _p(w):
+    return w / w.sum()
+
+
+def rng_for(seed: int, table: str, shard: int = 0) -> np.random.Generator:
+    """Independent, reproducible stream per (seed, table, shard)."""
+    return np.random.default_rng([seed, TABLE_NO[table], shard])
+
+
+def _pick(rng, values, weights, n):
+    return values[rng.choice(len(values), size=n, p=_p(weights))]
+
+
+def _nullable(values, mask):
+    """Nullable Int64 column: `values` where `mask`, NA elsewhere."""
+    return pd.Series(values, dtype="Int64").where(mask)
+
+
+def _ids(table, start, n):
+    return np.arange(ID_BASE[table] + start, ID_BASE[table] + start + n, dtype=np.int64)
+
+
+# =========================
+# Scale plan
+# =========================
+def plan(transactions: int, shard_rows: int) -> dict:
+    """Row counts for every table, derived from the number of transactions."""
+    customers = max(30, transactions // 4)
+    products = int(min(200_000, max(30, transactions // 2_000)))
+    stores = int(min(5_000, max(15, transactions // 200_000)))
+    campaigns = int(min(5_000, max(30, transactions // 100_000)))
+    return {
+        "transactions": transactions,
+        "customers": customers,
+        "products": products,
+        "stores": stores,
+        "marketing_campaigns": campaigns,
+        "shard_rows": shard_rows,
+        "tx_shards": -(-transactions // shard_rows),
+        "customer_shards": -(-customers // shard_rows),
+    }
+
+
+# =========================
+# Dimension tables (small; regenerated on demand by any worker)
+# =========================
+def gen_products(seed: int, n: int) -> pd.DataFrame:
+    rng = rng_for(seed, "products")
+    cats = np.array(list(CATEGORIES))
+    cat_idx = rng.choice(len(cats), size=n, p=_p(CATEGORY_P))
+    sub = np.empty(n, dtype=object)
+    noun = np.empty(n, dtype=object)
+    for i, c in enumerate(cats):
+        m = cat_idx == i
+        subs, nouns = CATEGORIES[c]
+        sub[m] = np.array(subs)[rng.integers(0, len(subs), m.sum())]
+        noun[m] = np.array(nouns)[rng.integers(0, len(nouns), m.sum())]
+    price = PRICE_POINTS[rng.integers(0, len(PRICE_POINTS), n)]
+    ids = _ids("products", 0, n)
+    return pd.DataFrame({
+        "product_id": ids,
+        "product_sku": pd.Series(ids - ID_BASE["products"] + 1).map("SKU-{:06d}".format).to_numpy(),
+        "product_name": pd.Series(ADJECTIVES[rng.integers(0, len(ADJECTIVES), n)]).str.cat(noun, sep=" ").to_numpy(),
+        "category": cats[cat_idx],
+        "subcategory": sub,
+        "brand": BRANDS[rng.integers(0, len(BRANDS), n)],
+        "cost": np.round(price * rng.uniform(0.25, 0.45, n), 2),
+        "retail_price": price,
+        "seasonal_flag": rng.random(n) < 8 / 30,
+        "launch_date": START - rng.integers(30, 4 * 365, n).astype("timedelta64[D]"),
+    })
+
+
+def gen_stores(seed: int, n: int) -> pd.DataFrame:
+    rng = rng_for(seed, "stores")
+    city = _pick(rng, CITIES, CITY_P, n)
+    stype_idx = rng.choice(len(STORE_TYPES), size=n, p=_p(STORE_TYPE_P))
+    return pd.DataFrame({
+        "store_id": _ids("stores", 0, n),
+        "store_name": pd.Series(city).str.cat(pd.Series(np.arange(1, n + 1)).astype(str), sep=" #").to_numpy(),
+        "store_type": STORE_TYPES[stype_idx],
+        "city": city,
+        "state": "TX",
+        "square_footage": (STORE_SQFT[stype_idx] * rng.uniform(0.8, 1.2, n)).round(-2).astype(np.int64),
+        "manager_name": pd.Series(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)])
+                          .str.cat(LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)], sep=" ").to_numpy(),
+        "opened_date": START - rng.integers(90, 6 * 365, n).astype("timedelta64[D]"),
+        "zone": _pick(rng, ZONES, ZONE_P, n),
+    })
+
+
+def gen_campaigns(seed: int, n: int) -> pd.DataFrame:
+    rng = rng_for(seed, "marketing_campaigns")
+    start = START + rng.integers(0, DAYS - 31, n).astype("timedelta64[D]")
+    ctype = _pick(rng, CAMPAIGN_TYPES, CAMPAIGN_TYPE_P, n)
+    return pd.DataFrame({
+        "campaign_id": _ids("marketing_campaigns", 0, n),
+        "campaign_name": pd.Series(ctype).str.cat(pd.Series(np.arange(1, n + 1)).astype(str), sep=" ").to_numpy(),
+        "campaign_type": ctype,
+        "channel": _pick(rng, CAMPAIGN_CHANNELS, CAMPAIGN_CHANNEL_P, n),
+        "start_date": start,
+        "end_date": start + rng.integers(6, 31, n).astype("timedelta64[D]"),
+        "budget": (rng.choice([1000, 5000, 8000, 15000, 25000, 40000], n)).astype(np.int64),
+        "target_audience": AUDIENCES[rng.integers(0, len(AUDIENCES), n)],
+        "campaign_goal": _pick(rng, GOALS, GOAL_P, n),
+        "status": _pick(rng, STATUS, STATUS_P, n),
+    })
+
+
+def gen_spend(seed: int, campaigns: pd.DataFrame) -> pd.DataFrame:
+    rng = rng_for(seed, "marketing_spend")
+    days = ((campaigns["end_date"] - campaigns["start_date"]).dt.days + 1).to_numpy()
+    cid = np.repeat(campaigns["campaign_id"].to_numpy(), days)
+    offset = np.arange(days.sum()) - np.repeat(np.cumsum(days) - days, days)
+    n = len(cid)
+    impressions = rng.integers(5_000, 60_000, n)
+    clicks = (impressions * rng.uniform(0.01, 0.07, n)).astype(np.int64)
+    conversions = rng.binomial(clicks, 0.004)
+    return pd.DataFrame({
+        "spend_id": _ids("marketing_spend", 0, n),
+        "campaign_id": cid,
+        "spend_date": np.repeat(campaigns["start_date"].to_numpy(), days) + offset.astype("timedelta64[D]"),
+        "channel": np.repeat(campaigns["channel"].to_numpy(), days),
+        "impressions": impressions,
+        "clicks": clicks,
+        "spend_amount": np.round(impressions * rng.uniform(0.02, 0.04, n), 2),
+        "conversions": conversions,
+        "revenue_attributed": np.round(conversions * rng.uniform(40, 120, n), 2),
+    })
+
+
+def gen_inventory(seed: int, products: pd.DataFrame, n_stores: int, snapshots: int = 2) -> pd.DataFrame:
+    """Each product stocked in a few stores plus the warehouse, on `snapshots` dates."""
+    rng = rng_for(seed, "inventory_snapshots")
+    n_prod = len(products)
+    per_product = np.minimum(rng.integers(1, 5, n_prod), n_stores)
+    pid = np.repeat(products["product_id"].to_numpy(), per_product + 1)
+    is_wh = np.zeros(len(pid), dtype=bool)
+    is_wh[np.cumsum(per_product + 1) - 1] = True
+    store = np.where(is_wh, -1, rng.integers(0, n_stores, len(pid)) + ID_BASE["stores"])
+    pid = np.tile(pid, snapshots)
+    store = np.tile(store, snapshots)
+    is_wh = np.tile(is_wh, snapshots)
+    date = np.repeat(START + (np.arange(snapshots) * 5 + 9).astype("timedelta64[D]"), len(pid) // snapshots)
+    n = len(pid)
+    on_hand = np.where(is_wh, rng.integers(100, 600, n), rng.integers(0, 60, n))
+    on_hand[rng.random(n) < 0.2] = 0
+    reserved = np.minimum(on_hand, rng.choice([0, 0, 0, 1, 2, 5, 10], n))
+    return pd.DataFrame({
+        "snapshot_id": _ids("inventory_snapshots", 0, n),
+        "snapshot_date": date,
+        "product_id": pid,
+        "store_id": _nullable(store, store >= 0),
+        "location_type": np.where(is_wh, "Warehouse", "Store"),
+        "quantity_on_hand": on_hand,
+        "quantity_available": on_hand - reserved,
+        "quantity_reserved": reserved,
+        "stockout_flag": on_hand == 0,
+        "days_of_supply": np.where(on_hand == 0, 0, (on_hand / rng.uniform(1, 4, n)).astype(np.int64)),
+    })
+
+
+# =========================
+# Fact tables (sharded)
+# =========================
+def gen_customers(seed: int, shard: int, start: int, n: int) -> pd.DataFrame:
+    rng = rng_for(seed, "customers", shard)
+    ids = _ids("customers", start, n)
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)]
+    seg_idx = rng.choice(len(SEGMENTS), size=n, p=_p(SEGMENT_P))
+    email = (pd.Series(first).str[0].str.lower() + "." + pd.Series(last).str.lower()
+             + pd.Series(ids).astype(str) + "@email.com")
+    return pd.DataFrame({
+        "customer_id": ids,
+        "first_name": first,
+        "last_name": last,
+        "email": email.to_numpy(),
+        "city": _pick(rng, CITIES, CITY_P, n),
+        "state": "TX",
+        "age": np.clip(rng.normal(35, 7, n), 18, 80).astype(np.int64),
+        "gender": np.where(rng.random(n) < 0.5, "F", "M"),
+        "customer_segment": SEGMENTS[seg_idx],
+        "acquisition_date": START - rng.integers(0, 4 * 365, n).astype("timedelta64[D]"),
+        "acquisition_channel": _pick(rng, ACQ_CHANNELS, ACQ_P, n),
+        "lifetime_value": np.round(SEGMENT_LTV[seg_idx] * rng.lognormal(0, 0.4, n), 1),
+        "churn_risk": _pick(rng, CHURN, CHURN_P, n),
+    })
+
+
+def customer_weights(seed: int, n_customers: int, shard_rows: int) -> np.ndarray:
+    """Purchase propensity per customer (by segment), consistent with gen_customers."""
+    w = np.empty(n_customers)
+    for shard, start in enumerate(range(0, n_customers, shard_rows)):
+        n = min(shard_rows, n_customers - start)
+        rng = rng_for(seed, "customers", shard)
+        # replay the same draws gen_customers makes before the segment choice
+        rng.integers(0, len(FIRST_NAMES), n)
+        rng.integers(0, len(LAST_NAMES), n)
+        w[start:start + n] = SEGMENT_FREQ[rng.choice(len(SEGMENTS), size=n, p=_p(SEGMENT_P))]
+    return w / w.sum()
+
+
+def gen_transactions(seed: int, shard: int, start: int, n: int, sizes: dict, prices: np.ndarray,
+                     cust_p: np.ndarray):
+    """One shard of transactions + their line items + the touchpoints that led to them."""
+    rng = rng_for(seed, "transactions", shard)
+    tx_id = _ids("transactions", start, n)
+    cust = rng.choice(len(cust_p), size=n, p=cust_p) + ID_BASE["customers"]
+    ts = START + rng.integers(0, DAYS * 24 * 60, n).astype("timedelta64[m]")
+    ch_idx = rng.choice(len(TX_CHANNELS), size=n, p=_p(TX_CHANNEL_P))
+    channel = TX_CHANNELS[ch_idx]
+    in_store = channel == "Store"
+    bopis = ~in_store & (rng.random(n) < 0.2)
+    fulfillment = np.where(in_store, "In-Store", np.where(bopis, "BOPIS", "Ship"))
+    store = np.where(in_store | bopis, rng.integers(0, sizes["stores"], n) + ID_BASE["stores"], -1)
+
+    # --- line items ---
+    irng = rng_for(seed, "transaction_items", shard)
+    k = ITEMS_PER_TX[irng.choice(len(ITEMS_PER_TX), size=n, p=_p(ITEMS_PER_TX_P))]
+    m = int(k.sum())
+    item_start = start * ITEMS_PER_TX.max()  # id ranges of different shards never overlap
+    owner = np.repeat(np.arange(n), k)
+    prod_idx = irng.integers(0, len(prices), m)
+    qty = np.where(irng.random(m) < 0.85, 1, 2)
+    unit = prices[prod_idx]
+    disc = DISCOUNTS[irng.choice(len(DISCOUNTS), size=m, p=_p(DISCOUNT_P))]
+    line = np.round(unit * qty * (1 - disc / 100), 2)
+    items = pd.DataFrame({
+        "item_id": _ids("transaction_items", item_start, m),
+        "transaction_id": tx_id[owner],
+        "product_id": prod_idx + ID_BASE["products"],
+        "quantity": qty,
+        "unit_price": unit,
+        "discount_percent": disc,
+        "line_total": line,
+    })
+
+    subtotal = np.round(np.bincount(owner, weights=unit * qty, minlength=n), 2)
+    discount = np.round(subtotal - np.bincount(owner, weights=line, minlength=n), 2)
+    tax = np.round((subtotal - discount) * 0.08, 2)
+    shipping = np.where((fulfillment == "Ship") & (subtotal < 100), 5.99, 0.0)
+    pay = _pick(rng, PAYMENTS, PAYMENT_P, n)
+    tx = pd.DataFrame({
+        "transaction_id": tx_id,
+        "customer_id": cust,
+        "order_date": ts,
+        "channel": channel,
+        "store_id": _nullable(store, store >= 0),
+        "payment_method": pay,
+        "card_bank": np.where(np.char.find(pay.astype(str), "ard") >= 0, _pick(rng, BANKS, BANK_P, n), ""),
+        "subtotal": subtotal,
+        "discount_amount": discount,
+        "tax_amount": tax,
+        "shipping_amount": shipping,
+        "total_amount": np.round(subtotal - discount + tax + shipping, 2),
+        "promo_code_used": np.where(discount > 0, _pick(rng, PROMOS[1:], PROMO_P[1:], n), ""),
+        "device_type": np.where(in_store, "", np.where(channel == "Mobile App", "Mobile",
+                                                      DEVICES[rng.integers(0, 2, n)])),
+        "fulfillment_method": fulfillment,
+        "return_flag": rng.random(n) < 3 / 45,
+    })
+
+    # --- touchpoints: ~2 per transaction, the last one converts ---
+    trng = rng_for(seed, "customer_touchpoints", shard)
+    tp_per = trng.integers(1, 4, n)
+    t = int(tp_per.sum())
+    tp_owner = np.repeat(np.arange(n), tp_per)
+    step = np.arange(t) - np.repeat(np.cumsum(tp_per) - tp_per, tp_per)
+    last = step == np.repeat(tp_per - 1, tp_per)
+    digital = TP_TYPES != "Store Visit"
+    tp_type = np.where(in_store[tp_owner] & last, "Store Visit",
+                       _pick(trng, TP_TYPES[digital], TP_TYPE_P[digital], t))
+    tp_channel = np.empty(t, dtype=object)
+    referrer = np.empty(t, dtype=object)
+    for typ, (chs, refs) in TP_CHANNEL.items():
+        sel = tp_type == typ
+        j = trng.integers(0, len(chs), sel.sum())
+        tp_channel[sel] = np.array(chs)[j]
+        referrer[sel] = np.array(refs)[j]
+    online = tp_type != "Store Visit"
+    pages = np.where(online, trng.integers(1, 19, t), 0)
+    adds = np.where(online & last, k[tp_owner], 0)
+    tp_cust = cust[tp_owner]
+    tp_store = store[tp_owner]
+    is_ad = np.isin(tp_type, ["Ad Click", "Ad View", "Email Open"])
+    touch = pd.DataFrame({
+        "touchpoint_id": _ids("customer_touchpoints", start * 3, t),  # <= 3 per transaction
+        "customer_id": tp_cust,
+        "session_id": ("sess_" + pd.Series(tp_cust).astype(str) + "_"
+                       + pd.Series(tx_id[tp_owner] % 100_000).astype(str).str.zfill(5) + "_"
+                       + pd.Series(step + 1).astype(str).str.zfill(2)).to_numpy(),
+        "touchpoint_timestamp": ts[tp_owner] - ((tp_per[tp_owner] - 1 - step) * trng.integers(30, 2_880, t)).astype("timedelta64[m]"),
+        "touchpoint_type": tp_type,
+        "channel": tp_channel,
+        "campaign_id": _nullable(trng.integers(0, sizes["marketing_campaigns"], t) + ID_BASE["marketing_campaigns"], is_ad),
+        "referrer_source": referrer,
+        "landing_page": np.where(online, LANDING[trng.integers(0, len(LANDING), t)], ""),
+        "pages_viewed": _nullable(pages, online),
+        "products_viewed": np.where(online, pd.Series(trng.integers(0, len(prices), t) + ID_BASE["products"])
+                                    .map("[{}]".format).to_numpy(), ""),
+        "cart_additions": adds,
+        "cart_value": np.where(online & last, subtotal[tp_owner], 0.0),
+        "converted_flag": last,
+        "transaction_id": _nullable(tx_id[tp_owner], last),
+        "device_type": np.where(online, tx["device_type"].to_numpy()[tp_owner], ""),
+        "store_id": _nullable(tp_store, last & (tp_store >= 0)),
+    })
+    return tx, items, touch
+
+
+# =========================
+# Writing
+# =========================
+def write_frame(df: pd.DataFrame, out_dir: str, table: str, shard: int, fmt: str) -> dict:
+    d = os.path.join(out_dir, table)
+    os.makedirs(d, exist_ok=True)
+    df = df[SCHEMAS[table]]
+    path = os.path.join(d, f"part-{shard:05d}.{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+    return {"table": table, "shard": shard, "rows": len(df), "path": os.path.relpath(path, out_dir)}
+
+
+def _customer_task(args):
+    seed, shard, start, n, out_dir, fmt = args
+    return [write_frame(gen_customers(seed, shard, start, n), out_dir, "customers", shard, fmt)]
+
+
+def _tx_task(args):
+    seed, shard, start, n, sizes, arr_dir, out_dir, fmt = args
+    load = lambda name: np.load(os.path.join(arr_dir, f"{name}.npy"), mmap_mode="r")
+    prices, cust_p = load("prices"), load("cust_p")
+    tx, items, touch = gen_transactions(seed, shard, start, n, sizes, prices, cust_p)
+    return [write_frame(tx, out_dir, "transactions", shard, fmt),
+            write_frame(items, out_dir, "transaction_items", shard, fmt),
+            write_frame(touch, out_dir, "customer_touchpoints", shard, fmt)]
+
+
+def generate(transactions: int, out_dir: str, seed: int = 42, fmt: str = "parquet",
+             shard_rows: int = 1_000_000, workers: int | None = None) -> dict:
+    """Generate every table into `out_dir`; returns the manifest (also written to manifest.json)."""
+    t0 = time.time()
+    sizes = plan(transactions, shard_rows)
+    os.makedirs(out_dir, exist_ok=True)
+    files = []
+
+    products = gen_products(seed, sizes["products"])
+    campaigns = gen_campaigns(seed, sizes["marketing_campaigns"])
+    files.append(write_frame(products, out_dir, "products", 0, fmt))
+    files.append(write_frame(gen_stores(seed, sizes["stores"]), out_dir, "stores", 0, fmt))
+    files.append(write_frame(campaigns, out_dir, "marketing_campaigns", 0, fmt))
+    files.append(write_frame(gen_spend(seed, campaigns), out_dir, "marketing_spend", 0, fmt))
+    files.append(write_frame(gen_inventory(seed, products, sizes["stores"]), out_dir, "inventory_snapshots", 0, fmt))
+
+    cust_tasks = [(seed, i, s, min(shard_rows, sizes["customers"] - s), out_dir, fmt)
+                  for i, s in enumerate(range(0, sizes["customers"], shard_rows))]
+    with tempfile.TemporaryDirectory(prefix="synth-arrays-") as tmp:
+        np.save(os.path.join(tmp, "prices.npy"), products["retail_price"].to_numpy())
+        np.save(os.path.join(tmp, "cust_p.npy"), customer_weights(seed, sizes["customers"], sizes["shard_rows"]))
+        tx_tasks = [(seed, i, s, min(shard_rows, transactions - s), sizes, tmp, out_dir, fmt)
+                    for i, s in enumerate(range(0, transactions, shard_rows))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for res in pool.map(_customer_task, cust_tasks):
+                files.extend(res)
+            for res in pool.map(_tx_task, tx_tasks):
+                files.extend(res)
+
+    rows = {}
+    for f in files:
+        rows[f["table"]] = rows.get(f["table"], 0) + f["rows"]
+    manifest = {"seed": seed, "format": fmt, "plan": sizes, "rows": rows, "files": files,
+                "seconds": round(time.time() - t0, 2)}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate synthetic StyleForward data at scale.")
+    ap.add_argument("--transactions", type=lambda s: int(float(s.replace("_", ""))), default=1_000_000,
+                    help="number of transactions (other tables scale from this), e.g. 1e6, 50_000_000")
+    ap.add_argument("--out", default="synthetic_out")
+    ap.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--shard-rows", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    args = ap.parse_args(argv)
+
+    m = generate(args.transactions, args.out, args.seed, args.format, args.shard_rows, args.workers)
+    for t, n in sorted(m["rows"].items()):
+        print(f"{t:<22} {n:>14,}")
+    print(f"done in {m['seconds']}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,194 @@
+from array import array
+
+UNITS = 1_000_000  # running totals are kept in millionths of a currency unit
+
+
+def _whole(quantity):
+    """Quantity as an int; whole floats/Decimals are accepted, fractions are not."""
+    try:
+        q = int(quantity)
+    except (TypeError, ValueError):
+        raise TypeError(f"quantity must be a whole number, got {quantity!r}") from None
+    if q != quantity:
+        raise ValueError(f"quantity must be a whole number, got {quantity!r}")
+    return q
+
+
 class Cart:
+    """
+    Shopping cart that keeps one line per (name, price) and running totals.
+
+    Adding an item that is already in the cart bumps that line's quantity
+    instead of appending a new line, and total_items()/total_price() are
+    kept up to date on every change, so reading them is O(1). Prices are
+    stored as floats and quantities as whole numbers; both are converted and
+    checked before the cart is changed. The running price total is an integer
+    count of UNITS (prices are rounded to 1e-6), so adding and removing lines
+    never leaves float error behind (0.1 + 0.2 - 0.1 is 0.2).
+    """
+
+    __slots__ = ("_lines", "_by_name", "_names", "_prices", "_units", "_qty", "_free",
+                 "_total_items", "_total_price")
+
     def __init__(self):
-        self.items = []
+        self._lines = {}      # (name, price) -> line number
+        self._by_name = {}    # name -> [(name, price), ...]
+        self._names = []
+        self._prices = array("d")
+        self._units = array("q")  # price in UNITS per line, for the running total
+        self._qty = array("q")
+        self._free = []       # slots of removed lines, reused by add_item()
+        self._total_items = 0
+        self._total_price = 0  # in UNITS
 
     def add_item(self, name, price, quantity=1):
-        self.items.append({"name": name, "price": price, "quantity": quantity})
+        """Add `quantity` units (0 is a no-op) of `name` at `price`."""
+        price = float(price)
+        quantity = _whole(quantity)
+        if quantity < 0:
+            raise ValueError("quantity must be >= 0")
+        if quantity == 0:
+            return
+        key = (name, price)
+        i = self._lines.get(key)
+        if i is None:
+            if self._free:
+                i = self._free.pop()
+                self._names[i], self._prices[i], self._qty[i] = name, price, 0
+                self._units[i] = round(price * UNITS)
+            else:
+                i = len(self._names)
+                self._names.append(name)
+                self._prices.append(price)
+                self._units.append(round(price * UNITS))
+                self._qty.append(0)
+            self._lines[key] = i
+            self._by_name.setdefault(name, []).append(key)
+        self._qty[i] += quantity
+        self._total_items += quantity
+        self._total_price += self._units[i] * quantity
+
+    def _find(self, name, price=None):
+        if price is not None:
+            key = (name, float(price))
+            if key not in self._lines:
+                raise KeyError(name)
+            return self._lines[key]
+        keys = self._by_name.get(name)
+        if not keys:
+            raise KeyError(name)
+        if len(keys) > 1:
+            raise ValueError(f"{name!r} is in the cart at several prices; pass price=")
+        return self._lines[keys[0]]
+
+    def set_quantity(self, name, quantity, price=None):
+        """Set a line's quantity (0 removes the line)."""
+        quantity = _whole(quantity)
+        if quantity < 0:
+            raise ValueError("quantity must be >= 0")
+        i = self._find(name, price)
+        delta = quantity - self._qty[i]
+        self._qty[i] = quantity
+        self._total_items += delta
+        self._total_price += self._units[i] * delta
+        if quantity == 0:
+            self._drop(i)
+
+    def remove_item(self, name, quantity=None, price=None):
+        """Remove `quantity` units of an item (default: the whole line)."""
+        if quantity is not None:
+            quantity = _whole(quantity)
+            if quantity < 0:
+                raise ValueError("quantity must be >= 0")
+        i = self._find(name, price)
+        left = 0 if quantity is None else max(0, self._qty[i] - quantity)
+        self.set_quantity(name, left, self._prices[i])
+
+    def _drop(self, i):
+        # The slot keeps quantity 0 and goes on the free list for the next new line.
+        key = (self._names[i], self._prices[i])
+        del self._lines[key]
+        keys = self._by_name[key[0]]
+        keys.remove(key)
+        if not keys:
+            del self._by_name[key[0]]
+        self._names[i] = None
+        self._free.append(i)
+
+    @property
+    def items(self):
+        return [{"name": self._names[i], "price": self._prices[i], "quantity": self._qty[i]}
+                for i in self._lines.values()]
+
+    def __len__(self):
+        return len(self._lines)
 
     def total_items(self):
-        return sum(item["quantity"] for item in self.items)
+        return self._total_items
 
     def total_price(self):
-        return sum(item["price"] * item["quantity"] for item in self.items)
+        return self._total_price / UNITS
+
+
+class CartBatch:
+    """
+    Many carts stored column-wise: cart `c` owns lines offsets[c]:offsets[c+1]
+    of (keys, prices, quantities). Built by carts_from_items().
+    """
+
+    def __init__(self, cart_ids, offsets, keys, prices, quantities):
+        self.cart_ids = cart_ids
+        self.offsets = offsets
+        self.keys = keys
+        self.prices = prices
+        self.quantities = quantities
+
+    def __len__(self):
+        return len(self.cart_ids)
+
+    def total_items(self):
+        """Items per cart (array aligned with cart_ids)."""
+        import numpy as np
+        return np.add.reduceat(self.quantities, self.offsets[:-1]) if len(self) else self.quantities[:0]
+
+    def total_price(self):
+        """Price per cart (array aligned with cart_ids)."""
+        import numpy as np
+        return np.add.reduceat(self.prices * self.quantities, self.offsets[:-1]) if len(self) else self.prices[:0]
+
+    def cart(self, c):
+        """Materialize cart number `c` as a Cart."""
+        cart = Cart()
+        for j in range(self.offsets[c], self.offsets[c + 1]):
+            cart.add_item(self.keys[j].item(), float(self.prices[j]), int(self.quantities[j]))
+        return cart
+
+
+def carts_from_items(transaction_id, product_id, quantity, unit_price):
+    """
+    Build one cart per transaction from columnar transaction_items data
+    (e.g. the columns of data/transaction_items.csv) in a single vectorized
+    pass: rows are sorted by (transaction, product, price) and repeated
+    products are merged by summing their quantities.
+    """
+    import numpy as np
+
+    tx = np.asarray(transaction_id)
+    prod = np.asarray(product_id)
+    qty = np.asarray(quantity, dtype=np.int64)
+    price = np.asarray(unit_price, dtype=np.float64)
+
+    order = np.lexsort((price, prod, tx))
+    tx, prod, qty, price = tx[order], prod[order], qty[order], price[order]
+
+    new_line = np.ones(len(tx), dtype=bool)
+    new_line[1:] = (tx[1:] != tx[:-1]) | (prod[1:] != prod[:-1]) | (price[1:] != price[:-1])
+    starts = np.flatnonzero(new_line)
+    line_qty = np.add.reduceat(qty, starts) if len(starts) else qty[:0]
+    line_tx, line_prod, line_price = tx[starts], prod[starts], price[starts]
+
+    new_cart = np.ones(len(line_tx), dtype=bool)
+    new_cart[1:] = line_tx[1:] != line_tx[:-1]
+    cart_starts = np.flatnonzero(new_cart)
+    offsets = np.append(cart_starts, len(line_tx))
+    return CartBatch(line_tx[cart_starts], offsets, line_prod, line_price, line_qty)
@@ -1,3 +1,5 @@
+import pytest
+
 from cart import Cart
 
 def test_cart_starts_empty():
@@ -12,3 +14,89 @@ def test_add_item_increases_count_and_price():
     assert cart.total_items() == 2
     assert cart.total_price() == 50.0
 
+
+def test_same_item_merges_into_one_line():
+    cart = Cart()
+    cart.add_item("shirt", 25.0)
+    cart.add_item("shirt", 25.0, quantity=2)
+    cart.add_item("hat", 10.0)
+
+    assert len(cart.items) == 2
+    assert cart.total_items() == 4
+    assert cart.total_price() == 85.0
+
+def test_remove_and_set_quantity_keep_totals():
+    cart = Cart()
+    cart.add_item("shirt", 25.0, quantity=3)
+    cart.add_item("hat", 10.0)
+
+    cart.remove_item("shirt", quantity=1)
+    assert cart.total_items() == 3
+    assert cart.total_price() == 60.0
+
+    cart.set_quantity("hat", 0)
+    assert [i["name"] for i in cart.items] == ["shirt"]
+    assert cart.total_price() == 50.0
+
+    cart.remove_item("shirt")
+    assert cart.items == []
+    assert cart.total_items() == 0
+    assert cart.total_price() == 0.0
+
+def test_bad_input_leaves_cart_unchanged():
+    from decimal import Decimal
+
+    cart = Cart()
+    cart.add_item("shirt", Decimal("25.00"), quantity=2.0)
+    cart.add_item("shirt", 25.0, quantity=0)
+    with pytest.raises(ValueError):
+        cart.add_item("hat", 10.0, quantity=1.5)
+    with pytest.raises(ValueError):
+        cart.add_item("hat", "ten")
+
+    assert cart.items == [{"name": "shirt", "price": 25.0, "quantity": 2}]
+    assert cart.total_items() == 2
+    assert cart.total_price() == 50.0
+
+def test_removed_lines_free_their_slot():
+    cart = Cart()
+    for _ in range(100):
+        cart.add_item("shirt", 25.0)
+        cart.remove_item("shirt")
+    cart.add_item("hat", 10.0)
+
+    assert len(cart._names) == 1
+    assert cart.items == [{"name": "hat", "price": 10.0, "quantity": 1}]
+
+def test_remove_rejects_negative_quantity():
+    cart = Cart()
+    cart.add_item("shirt", 25.0, quantity=2)
+    with pytest.raises(ValueError):
+        cart.remove_item("shirt", quantity=-5)
+    assert cart.total_items() == 2
+    assert cart.total_price() == 50.0
+
+def test_total_price_does_not_drift_after_removals():
+    cart = Cart()
+    cart.add_item("a", 0.1)
+    cart.add_item("b", 0.2)
+    cart.remove_item("a")
+    assert cart.total_price() == 0.2
+
+def test_carts_from_items_batch():
+    pytest.importorskip("numpy")
+    from cart import carts_from_items
+
+    batch = carts_from_items(
+        transaction_id=[2, 1, 1, 2, 1],
+        product_id=[7, 5, 6, 7, 5],
+        quantity=[1, 1, 2, 3, 1],
+        unit_price=[4.0, 10.0, 1.5, 4.0, 10.0],
+    )
+    assert list(batch.cart_ids) == [1, 2]
+    assert list(batch.total_items()) == [4, 4]
+    assert list(batch.total_price()) == [23.0, 16.0]
+
+    cart = batch.cart(0)
+    assert len(cart.items) == 2
+    assert cart.total_price() == 23.0
@@ -0,0 +1,105 @@
+import os
+import sys
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "streamlit"))
+from data_registry import DataRegistry, dataset_key
+
+
+def _table(n):
+    return pa.table({"x": list(range(n))})
+
+
+def test_same_bytes_same_key():
+    assert dataset_key(b"a,b\n1,2", "opts") == dataset_key(b"a,b\n1,2", "opts")
+    assert dataset_key(b"a,b\n1,2", "opts") != dataset_key(b"a,b\n1,2", "other")
+
+
+def test_loader_runs_once_and_table_is_shared():
+    reg = DataRegistry(cap_bytes=10**9)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return _table(10), {"name": "t"}
+
+    t1, _ = reg.get_or_load("k", loader)
+    t2, meta = reg.get_or_load("k", loader)
+    assert len(calls) == 1
+    assert t1 is t2
+    assert meta == {"name": "t"}
+
+
+def test_lru_eviction_skips_leased_datasets():
+    one = _table(1000).nbytes
+    reg = DataRegistry(cap_bytes=int(one * 2.5))
+    with reg.lease("a", lambda: (_table(1000), {})):
+        reg.put("b", _table(1000))
+        reg.put("c", _table(1000))  # over cap: "b" is the oldest idle entry
+        assert "a" in reg and "b" not in reg and "c" in reg
+    assert reg.snapshot()[0]["refs"] == 0
+
+
+def test_put_of_a_resident_key_skips_conversion():
+    reg = DataRegistry(cap_bytes=10**9)
+    t, _ = reg.put("k", _table(10))
+
+    class NotConvertible:
+        pass
+
+    assert reg.put("k", NotConvertible(), pin=True)[0] is t
+    assert reg.snapshot()[0]["refs"] == 1
+
+
+def test_failed_load_caches_nothing():
+    reg = DataRegistry(cap_bytes=10**9)
+
+    def broken():
+        raise ValueError("bad file")
+
+    with pytest.raises(ValueError):
+        with reg.lease("k", broken):
+            pass
+    assert "k" not in reg and not reg._load_locks
+
+
+def test_waiters_keep_the_load_lock_when_a_loader_fails():
+    import threading
+    import time
+
+    reg = DataRegistry(cap_bytes=10**9)
+    state = {"active": 0, "max": 0, "calls": 0}
+    guard = threading.Lock()
+
+    def loader():
+        with guard:
+            state["calls"] += 1
+            state["active"] += 1
+            state["max"] = max(state["max"], state["active"])
+            first = state["calls"] == 1
+        time.sleep(0.05)
+        with guard:
+            state["active"] -= 1
+        if first:
+            raise ValueError("bad file")
+        return _table(10), {}
+
+    def worker():
+        try:
+            reg.get_or_load("k", loader)
+        except ValueError:
+            pass
+
+    # 1st load fails at ~50 ms while the 2nd caller waits; the 2nd then loads
+    # until ~100 ms, and callers arriving meanwhile must wait for it.
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t, delay in zip(threads, (0.01, 0.06, 0.01, 0)):
+        t.start()
+        time.sleep(delay)
+    for t in threads:
+        t.join()
+    assert state["max"] == 1 and state["calls"] == 2
+    assert "k" in reg and not reg._load_locks
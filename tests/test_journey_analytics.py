@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "omni"))
+from journey_analytics import (BIT, analyze, bootstrap_ci, load_journeys, segment_stats,
+                               synthetic_journeys)
+
+
+def test_bundled_dataset_packs_flags_and_segments():
+    j = load_journeys()
+    assert len(j) == 100
+    # C001: app, website, store and email
+    assert j.channels[0] == BIT["mobile_app"] | BIT["website"] | BIT["store"] | BIT["email"]
+    assert "None" in j.abandonment_labels  # a real stage, not a missing value
+
+    stats = segment_stats(j)
+    for fam, part in stats.groupby("family"):
+        assert part["customers"].sum() == 100, fam
+    ropo = stats[(stats["family"] == "journey_type") & (stats["segment"] == "ROPO")].iloc[0]
+    assert ropo["customers"] == 9
+    assert ropo["conversion_rate"] == ropo["conversions"] / ropo["customers"]
+
+
+def test_bootstrap_is_deterministic_and_brackets_the_estimate():
+    j = synthetic_journeys(20_000, seed=3, shard_rows=7_000, workers=1)
+    assert np.array_equal(j.channels, synthetic_journeys(20_000, seed=3, shard_rows=7_000, workers=2).channels)
+
+    a = bootstrap_ci(j, ["fulfilment"], reps=60, seed=1, workers=1)
+    b = bootstrap_ci(j, ["fulfilment"], reps=60, seed=1, workers=2)
+    pd.testing.assert_frame_equal(a, b)
+
+    table = analyze(j, ["fulfilment"], reps=60, seed=1, workers=1)
+    assert (table["conversion_rate_lo"] <= table["conversion_rate"]).all()
+    assert (table["conversion_rate"] <= table["conversion_rate_hi"]).all()
@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "streamlit"))
+from streaming_stats import Histogram, StreamingSummary, summarize_csv
+
+
+def _data(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.concatenate([rng.lognormal(3, 1, n), rng.normal(-50, 5, n // 100)])
+    rng.shuffle(x)
+    return x
+
+
+def test_chunked_and_merged_summaries_match_the_full_column():
+    x = _data()
+    left, right = StreamingSummary(), StreamingSummary()
+    for chunk in np.array_split(x[:120_000], 5):
+        left.update(chunk)
+    for chunk in np.array_split(x[120_000:], 3):
+        right.update(chunk)
+    s = left.merge(right)
+
+    ref = pd.Series(x).describe()
+    got = s.describe()
+    assert list(got.index) == list(ref.index)
+    for k in ("count", "min", "max"):
+        assert got[k] == ref[k]
+    assert got["mean"] == pytest.approx(ref["mean"], rel=1e-9)
+    assert got["std"] == pytest.approx(ref["std"], rel=1e-9)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):  # rank error of the t-digest estimate
+        assert abs((x < s.digest.quantile(q)).mean() - q) < 0.002
+
+    counts, _ = np.histogram(x, bins=s.hist.edges())
+    assert np.array_equal(counts, s.hist.counts)
+    assert len(s.hist.counts) <= s.hist.bins
+
+    grid, density = s.kde()
+    area = ((density[1:] + density[:-1]) / 2 * np.diff(grid)).sum()
+    assert area == pytest.approx(1.0, abs=1e-3)
+
+
+def test_histogram_merge_aligns_bins_of_different_widths():
+    a = Histogram(bins=32).update(np.linspace(0, 1, 1000))
+    b = Histogram(bins=32).update(np.linspace(-500, 800, 1000))
+    merged = a.copy().merge(b)
+    assert merged.counts.sum() == 2000
+    both = np.r_[np.linspace(0, 1, 1000), np.linspace(-500, 800, 1000)]
+    counts, _ = np.histogram(both, bins=merged.edges())
+    assert np.array_equal(counts, merged.counts)
+
+
+def test_summarize_csv_reads_one_column_in_chunks_and_skips_junk():
+    df = pd.DataFrame({"id": range(10_000), "amount": np.arange(10_000) * 0.5})
+    df["amount"] = df["amount"].astype(object)
+    df.loc[::100, "amount"] = "n/a"
+    s = summarize_csv(io.BytesIO(df.to_csv(index=False).encode("utf-8")), "amount", chunksize=1_500)
+    assert s.missing == 100
+    assert s.moments.n == 9_900
+    assert s.describe()["max"] == 4999.5
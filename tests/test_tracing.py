@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "streamlit"))
+from tracing import SamplingProfiler, export_jsonl, span, start_trace, stop_trace
+
+
+def test_span_is_noop_without_trace():
+    with span("anything") as s:
+        assert s is None
+
+
+def test_nested_spans_and_jsonl_export(tmp_path):
+    trace = start_trace("test")
+    with span("outer"):
+        with span("inner", rows=3):
+            time.sleep(0.01)
+    stop_trace()
+
+    outer, inner = trace.spans
+    assert (outer.depth, inner.depth) == (0, 1)
+    assert outer.duration >= inner.duration >= 0.01
+    assert inner.attrs == {"rows": 3}
+
+    path = export_jsonl(trace, str(tmp_path / "spans.jsonl"))
+    recs = [json.loads(line) for line in open(path)]
+    assert [r["name"] for r in recs] == ["outer", "inner"]
+
+
+def test_sampling_profiler_collects_stacks():
+    prof = SamplingProfiler(interval=0.001).start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    stacks = prof.stop()
+    assert sum(stacks.values()) > 0
+    assert any("test_sampling_profiler_collects_stacks" in k for k in stacks)
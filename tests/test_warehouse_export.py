@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "streamlit"))
+from warehouse_export import SQLiteLoader, check_table_name, export_frame
+
+
+def _frame(n):
+    return pd.DataFrame({
+        "transaction_id": range(n),
+        "amount": [i * 0.5 for i in range(n)],
+        "segment": ["High-Value" if i % 3 else "Standard" for i in range(n)],
+        "order_date": pd.date_range("2024-01-01", periods=n, freq="h"),
+    })
+
+
+def _count(db, table):
+    with sqlite3.connect(db) as con:
+        return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class _FailingLoader(SQLiteLoader):
+    """Dies on the n-th load() call, like a dropped connection mid-export."""
+    def __init__(self, path, fail_on):
+        super().__init__(path)
+        self.calls, self.fail_on = 0, fail_on
+
+    def load(self, table, run_id, files):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise ConnectionError("lost connection")
+        super().load(table, run_id, files)
+
+
+def test_export_in_chunks_and_rerun_is_a_noop(tmp_path):
+    db, work = str(tmp_path / "wh.db"), str(tmp_path / "exports")
+    events = []
+    summary = export_frame(_frame(10_000), "results", SQLiteLoader(db), chunk_rows=3_000,
+                           export_dir=work, progress=events.append)
+    assert summary["chunks"] == 4 and summary["loaded_rows"] == 10_000
+    assert _count(db, "results") == 10_000
+    assert events[-1]["phase"] == "done" and events[-1]["done"] == 4
+
+    assert not os.path.exists(os.path.join(work, summary["run_id"]))
+
+    again = export_frame(_frame(10_000), "results", SQLiteLoader(db), chunk_rows=3_000, export_dir=work)
+    assert again["skipped_chunks"] == 0 and again["loaded_rows"] == 0
+    assert _count(db, "results") == 10_000
+
+
+def test_export_after_target_reset_loads_everything(tmp_path):
+    db, work = str(tmp_path / "wh.db"), str(tmp_path / "exports")
+    export_frame(_frame(10_000), "results", SQLiteLoader(db), chunk_rows=3_000, export_dir=work, keep_files=True)
+    os.remove(db)
+
+    again = export_frame(_frame(10_000), "results", SQLiteLoader(db), chunk_rows=3_000, export_dir=work)
+    assert again["skipped_chunks"] == 0 and again["loaded_rows"] == 10_000
+    assert _count(db, "results") == 10_000
+
+
+def test_export_after_drop_table_loads_everything(tmp_path):
+    db, work = str(tmp_path / "wh.db"), str(tmp_path / "exports")
+    export_frame(_frame(10), "results", SQLiteLoader(db), chunk_rows=3, export_dir=work)
+    with sqlite3.connect(db) as con:
+        con.execute("DROP TABLE results")
+
+    again = export_frame(_frame(10), "results", SQLiteLoader(db), chunk_rows=3, export_dir=work)
+    assert again["loaded_rows"] == 10
+    assert _count(db, "results") == 10
+
+
+def test_failed_export_resumes_without_duplicates(tmp_path):
+    db, work = str(tmp_path / "wh.db"), str(tmp_path / "exports")
+    df = _frame(10_000)
+    with pytest.raises(ConnectionError):
+        export_frame(df, "results", _FailingLoader(db, fail_on=3), chunk_rows=2_000, export_dir=work)
+    assert _count(db, "results") == 4_000
+
+    summary = export_frame(df, "results", SQLiteLoader(db), chunk_rows=2_000, export_dir=work)
+    assert summary["skipped_chunks"] == 2 and summary["loaded_rows"] == 6_000
+    assert _count(db, "results") == 10_000
+
+
+def test_table_names_are_checked():
+    assert check_table_name("DB.PUBLIC.RESULTS") == "DB.PUBLIC.RESULTS"
+    with pytest.raises(ValueError):
+        check_table_name("results; DROP TABLE x")